@@ -0,0 +1,88 @@
+"""
+Compression benchmark
+
+Compress repetitive record list events with plain deflate, deflate with trained dictionary and zstd
+with trained dictionary (if zstandard installed), report bytes on wire and compress CPU per event,
+then broadcast events to N receivers with compressed frame memo and without it
+
+    cd src && python -m benchmarks.compression --events 500 --rows 100 --receivers 1000
+"""
+import argparse
+import json
+import random
+import time
+
+from channels_simplify.compression import Codec, ZlibCodec, ZstdCodec, train_dictionary, zstandard
+
+
+def make_event(rows: int, rng: random.Random) -> str:
+    return json.dumps({
+        'event': 'leaderboard.update',
+        'payload': {'rows': [{
+            'id': rng.randrange(10 ** 6),
+            'username': f'player-{rng.randrange(10 ** 4)}',
+            'score': rng.randrange(10 ** 5),
+            'level': rng.randrange(100),
+            'online': rng.random() < 0.5,
+            'team': rng.choice(('red', 'blue', 'green')),
+        } for _ in range(rows)]},
+    })
+
+
+def codecs(samples: list) -> dict:
+    result = {
+        'deflate': ZlibCodec(),
+        'deflate+dict': ZlibCodec(train_dictionary(samples)),
+    }
+    if zstandard is not None:
+        result['zstd'] = ZstdCodec()
+        result['zstd+dict'] = ZstdCodec(train_dictionary(samples, size=16 * 1024, codec='zstd'))
+    return result
+
+
+def measure_codec(codec, events: list) -> tuple:
+    started = time.process_time()
+    size = sum(len(codec.frame('leaderboard.update', event)) for event in events)
+    return size, time.process_time() - started
+
+
+def measure_broadcast(codec, events: list, receivers: int, memo: bool) -> float:
+    codec.memo.clear()
+    codec.memo_size = Codec.memo_size if memo else 0
+    started = time.process_time()
+    for event in events:
+        for _ in range(receivers):
+            codec.frame('leaderboard.update', event)
+    return time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=100, help='Records per event')
+    parser.add_argument('--receivers', type=int, default=1000, help='Connections receiving each broadcast')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    samples = [make_event(args.rows, rng).encode('utf-8') for _ in range(50)]
+    events = [make_event(args.rows, rng) for _ in range(args.events)]
+    plain = sum(len(event.encode('utf-8')) for event in events)
+    print(f'plain: {plain / args.events:.0f} B per event')
+
+    for name, codec in codecs(samples).items():
+        codec.memo_size = 0
+        size, cpu = measure_codec(codec, events)
+        print(f'{name}: {size / args.events:.0f} B per event ({size / plain:.1%} of plain), '
+              f'{cpu / args.events * 1e6:.0f} us CPU per event')
+
+    codec = ZlibCodec(train_dictionary(samples))
+    broadcast = events[:max(1, args.events // 50)]
+    without_memo = measure_broadcast(codec, broadcast, args.receivers, memo=False)
+    with_memo = measure_broadcast(codec, broadcast, args.receivers, memo=True)
+    print(f'broadcast to {args.receivers} receivers, deflate+dict: '
+          f'{without_memo / len(broadcast) * 1e3:.1f} ms CPU per event compressed per receiver, '
+          f'{with_memo / len(broadcast) * 1e3:.1f} ms compressed once')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Dispatch overhead benchmark
+
+Dispatch group messages to one TestConsumer connection directly and report time per message
+with database connections housekeeping (uses_db = True), declared database free (uses_db = False)
+and detected database free event (uses_db = None, query counted on each dispatch)
+
+Every mode is warmed up first, then runs are repeated with mode order rotated each round,
+median and best run per mode are reported
+
+    cd src && python -m benchmarks.dispatch_overhead --messages 2000 --repeats 7
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.environment import setup, create_users
+
+MODES = {'housekeeping': True, 'declared': False, 'detected': None}
+
+
+async def run_mode(consumer, communicator, event, uses_db, messages: int) -> float:
+    """Seconds per message"""
+    from channels_simplify.db import db_usage
+    from channels_simplify.publisher import channels_content
+
+    event.uses_db = uses_db
+    if uses_db is None:
+        db_usage.free_dispatches[event] = db_usage.detect_dispatches
+    started = time.perf_counter()
+    for _ in range(messages):
+        await consumer.dispatch(channels_content(event, {}, group=consumer.broadcast_group))
+        await communicator.receive_output()
+    return (time.perf_counter() - started) / messages
+
+
+async def measure(messages: int, warmup: int, repeats: int) -> dict:
+    from asgiref.sync import sync_to_async
+    from channels.testing import WebsocketCommunicator
+    from channels_simplify.admission import admission
+    from django_app.asgi import application
+    from test_consumer import TestConsumer
+
+    user_id, = await sync_to_async(create_users)(1)
+    communicator = WebsocketCommunicator(application, f'/ws/{user_id}/')
+    await communicator.connect()
+    await asyncio.sleep(0.1)
+    consumer, = admission.consumers
+    event = TestConsumer.TestEventAllAndSelf
+
+    for uses_db in MODES.values():
+        await run_mode(consumer, communicator, event, uses_db, warmup)
+    results = {mode: [] for mode in MODES}
+    modes = list(MODES)
+    for repeat in range(repeats):
+        order = modes[repeat % len(modes):] + modes[:repeat % len(modes)]
+        for mode in order:
+            results[mode].append(await run_mode(consumer, communicator, event, MODES[mode], messages))
+    await communicator.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=500)
+    parser.add_argument('--repeats', type=int, default=7)
+    args = parser.parse_args()
+    setup()
+    results = asyncio.run(measure(args.messages, args.warmup, args.repeats))
+    for mode, runs in results.items():
+        print(f'{mode}: median {statistics.median(runs) * 1e6:.1f} us, best {min(runs) * 1e6:.1f} us per message')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import warnings
+
+
+def setup():
+    """Configure django_app with temporary database, must be called before import of consumers"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+    from django_app import settings
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'db.sqlite3')
+
+    import django
+    django.setup()
+
+    from django.core.cache import CacheKeyWarning
+    warnings.simplefilter('ignore', CacheKeyWarning)
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def create_users(count: int) -> list:
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    User.objects.bulk_create([User(username=f'user-{i}') for i in range(count)])
+    return list(User.objects.values_list('id', flat=True))
+
+
+def rss() -> int:
+    """Resident set size of process in bytes"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,60 @@
+"""
+Idle connections memory benchmark
+
+Open N idle TestConsumer connections and report RSS and python heap bytes per connection
+
+    cd src && python -m benchmarks.idle_memory --connections 5000
+"""
+import argparse
+import asyncio
+import gc
+import tracemalloc
+
+from benchmarks.environment import setup, create_users, rss
+
+
+async def open_connections(application, user_ids: list) -> list:
+    from channels.testing import WebsocketCommunicator
+    communicators = []
+    for user_id in user_ids:
+        communicator = WebsocketCommunicator(application, f'/ws/{user_id}/')
+        connected, _ = await communicator.connect()
+        assert connected, 'Connection rejected'
+        communicators.append(communicator)
+    return communicators
+
+
+async def measure(connections: int):
+    from django_app.asgi import application
+    from asgiref.sync import sync_to_async
+
+    user_ids = await sync_to_async(create_users)(connections)
+
+    # Warm up imports, caches and channel layer before baseline
+    await asyncio.gather(*[c.disconnect() for c in await open_connections(application, user_ids[:10])])
+    gc.collect()
+    rss_before = rss()
+    heap_before = tracemalloc.get_traced_memory()[0]
+
+    communicators = await open_connections(application, user_ids)
+    gc.collect()
+    rss_after = rss()
+    heap_after = tracemalloc.get_traced_memory()[0]
+
+    print(f'{connections} idle connections, test communicator overhead included')
+    print(f'RSS per connection: {(rss_after - rss_before) / connections:.0f} bytes')
+    print(f'Python heap per connection: {(heap_after - heap_before) / connections:.0f} bytes')
+    await asyncio.gather(*[c.disconnect() for c in communicators])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=1000)
+    args = parser.parse_args()
+    setup()
+    tracemalloc.start()
+    asyncio.run(measure(args.connections))
+
+
+if __name__ == '__main__':
+    main()
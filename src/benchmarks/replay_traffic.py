@@ -0,0 +1,154 @@
+"""
+Traffic replay
+
+Replay traffic capture recorded with channels_simplify.capture against local django_app, every recorded
+connection is opened as its own client at recorded offsets, so concurrency shape of recording is kept.
+Latency is time from frame sent to next message received by same client, frames without reply are not counted.
+
+    cd src && python -m benchmarks.replay_traffic traffic.cap --speed 1 --output before.json
+    cd src && python -m benchmarks.replay_traffic traffic.cap --speed 0 --compare before.json
+
+Speed 1 replay in real time, N replay N times faster, 0 send as fast as server accept
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+
+from benchmarks.environment import setup, create_users
+
+
+def percentile(values: list, part: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * part))]
+
+
+class Client:
+    """Replay of one recorded connection"""
+
+    def __init__(self, application, path: str, records: list):
+        from channels.testing import WebsocketCommunicator
+        self.communicator = WebsocketCommunicator(application, path)
+        self.records = records
+        self.sent = deque()  #: Send time of frames waiting for reply
+        self.latencies = []
+        self.frames = 0
+
+    async def receive(self):
+        while True:
+            message = await self.communicator.output_queue.get()
+            if message['type'] == 'websocket.close':
+                return
+            if self.sent:
+                self.latencies.append(time.perf_counter() - self.sent.popleft())
+
+    async def run(self, started: float, speed: float):
+        from channels_simplify.capture import RecordKind
+        connected, _ = await self.communicator.connect()
+        if not connected:
+            return
+        receiver = asyncio.ensure_future(self.receive())
+        try:
+            for record in self.records:
+                if speed:
+                    await asyncio.sleep(max(0.0, started + record.timestamp / speed - time.perf_counter()))
+                if record.kind == RecordKind.disconnect:
+                    break
+                self.sent.append(time.perf_counter())
+                self.frames += 1
+                if record.kind == RecordKind.text:
+                    await self.communicator.send_to(text_data=record.data.decode('utf-8'))
+                else:
+                    await self.communicator.send_to(bytes_data=record.data)
+            # Let replies of last frames arrive
+            await asyncio.sleep(0.1)
+        finally:
+            receiver.cancel()
+            await self.communicator.disconnect()
+
+
+async def replay(path: str, speed: float, path_template: str) -> dict:
+    from asgiref.sync import sync_to_async
+    from channels_simplify.capture import read_capture, RecordKind
+    from django_app.asgi import application
+
+    connects, frames = {}, defaultdict(list)
+    for record in read_capture(path):
+        if record.kind == RecordKind.connect:
+            connects[record.connection] = record
+        elif record.connection in connects:
+            frames[record.connection].append(record)
+
+    recorded_users = sorted({record.user for record in connects.values() if record.user})
+    local_users = await sync_to_async(create_users)(len(recorded_users))
+    users = dict(zip(recorded_users, local_users))
+
+    clients = [
+        (connect, Client(application, path_template.format(user_id=users.get(connect.user, 0)), frames[connection]))
+        for connection, connect in connects.items()
+    ]
+
+    async def start(connect, client: Client):
+        if speed:
+            await asyncio.sleep(max(0.0, started + connect.timestamp / speed - time.perf_counter()))
+        await client.run(started, speed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[start(connect, client) for connect, client in clients])
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for _, client in clients for latency in client.latencies]
+    sent = sum(client.frames for _, client in clients)
+    return {
+        'connections': len(clients),
+        'frames': sent,
+        'replies': len(latencies),
+        'seconds': round(elapsed, 3),
+        'frames_per_second': round(sent / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5) * 1e3, 3),
+            'p95': round(percentile(latencies, 0.95) * 1e3, 3),
+            'p99': round(percentile(latencies, 0.99) * 1e3, 3),
+            'max': round(max(latencies, default=0.0) * 1e3, 3),
+        },
+    }
+
+
+def compare(report: dict, baseline: dict):
+    def changes(current: dict, previous: dict, prefix: str = ''):
+        for key, value in current.items():
+            if isinstance(value, dict):
+                yield from changes(value, previous.get(key, {}), f'{prefix}{key}.')
+            elif previous.get(key):
+                yield f'{prefix}{key}', previous[key], value, (value - previous[key]) / previous[key] * 100
+
+    for name, before, after, change in changes(report, baseline):
+        print(f'{name:<20} {before:>12} -> {after:<12} {change:+.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('capture', help='Traffic capture file')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed multiplier, 0 for max speed')
+    parser.add_argument('--path', default='/ws/{user_id}/', help='Websocket path, recorded users are mapped '
+                                                                  'to new local users')
+    parser.add_argument('--output', help='Write report to json file')
+    parser.add_argument('--compare', help='Report json of previous run, e.g. of other code version')
+    args = parser.parse_args()
+    setup()
+    report = asyncio.run(replay(args.capture, args.speed, args.path))
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(report, json.load(baseline))
+    else:
+        print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=4)
+
+
+if __name__ == '__main__':
+    main()
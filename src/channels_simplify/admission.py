@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import Counter
+
+
+class CloseCode:
+    """Websocket close codes sent on rejected or drained connections"""
+    service_restart = 1012  #: Server is draining, reconnect to another node
+    try_again_later = 1013  #: Server is overloaded, reconnect after retry_after seconds
+
+
+class Admission:
+    """
+    Process wide admission control
+
+    Track live consumers, pending dispatches and average dispatch latency,
+    new connections are rejected while consumer limits are exceeded or process is draining
+    """
+
+    latency_smoothing = 0.1  #: Weight of last dispatch in latency moving average
+
+    def __init__(self):
+        self.consumers = weakref.WeakSet()  #: Live consumers of process
+        self.counts = Counter()  #: Consumer class -> live connections
+        self.pending = 0  #: Dispatches waiting or running in worker thread
+        self.latency = 0.0  #: Moving average of dispatch latency in seconds, including wait for worker thread
+        self.draining = False
+        self.loop = None  #: Event loop serving consumers, set on first connection
+        self.lock = threading.Lock()  #: Guard consumers, introspection read them from other threads
+
+    def register(self, consumer):
+        with self.lock:
+            self.consumers.add(consumer)
+            self.counts[consumer.__class__] += 1
+
+    def unregister(self, consumer):
+        with self.lock:
+            if consumer in self.consumers:
+                self.consumers.discard(consumer)
+                self.counts[consumer.__class__] -= 1
+
+    def live(self) -> list:
+        """Copy of live consumers, safe to iterate from any thread"""
+        with self.lock:
+            return list(self.consumers)
+
+    def dispatch_started(self) -> float:
+        self.pending += 1
+        return time.perf_counter()
+
+    def dispatch_finished(self, started: float):
+        self.pending -= 1
+        elapsed = time.perf_counter() - started
+        self.latency += (elapsed - self.latency) * self.latency_smoothing
+
+    def reject_code(self, consumer) -> [int, None]:
+        """Close code for new connection, None if connection admitted"""
+        if self.draining:
+            return CloseCode.service_restart
+        if consumer.max_connections is not None and self.counts[consumer.__class__] >= consumer.max_connections:
+            return CloseCode.try_again_later
+        if consumer.max_pending_dispatches is not None and self.pending > consumer.max_pending_dispatches:
+            return CloseCode.try_again_later
+        if consumer.max_dispatch_latency is not None and self.latency > consumer.max_dispatch_latency:
+            return CloseCode.try_again_later
+        return None
+
+    async def drain(self, wave_size: int = 100, interval: float = 1.0):
+        """
+        Stop accepting connections and close live ones in waves of wave_size every interval seconds
+
+        Each consumer receive drain message through channel layer, notify client to reconnect elsewhere and close
+        """
+        self.draining = True
+        consumers = self.live()
+        for i in range(0, len(consumers), wave_size):
+            await asyncio.gather(*[
+                consumer.channel_layer.send(consumer.channel_name, {'type': 'drain.close'})
+                for consumer in consumers[i:i + wave_size]
+            ])
+            if i + wave_size < len(consumers):
+                await asyncio.sleep(interval)
+
+    def start_drain(self, wave_size: int = 100, interval: float = 1.0):
+        """Start drain from any thread, e.g. from deploy signal handler"""
+        if not self.loop:
+            self.draining = True
+            return None
+        return asyncio.run_coroutine_threadsafe(self.drain(wave_size=wave_size, interval=interval), self.loop)
+
+
+admission = Admission()  #: Admission state of process
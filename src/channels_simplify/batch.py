@@ -0,0 +1,35 @@
+import asyncio
+
+
+class LayerBatch:
+    """
+    Channel layer writes collected while consumer handle one message
+
+    Flushed with one event loop hop instead of one async_to_sync round trip per write,
+    writes to different destinations go concurrently, writes to same destination keep their order.
+    Failed write, e.g. ChannelFull of dead channel, stop only writes to its destination, others are finished
+    """
+
+    def __init__(self, channel_layer):
+        self.channel_layer = channel_layer
+        self.writes = {}  #: Destination -> [(layer method name, message)]
+
+    def __len__(self):
+        return sum(map(len, self.writes.values()))
+
+    def add(self, method: str, destination: str, message):
+        self.writes.setdefault(destination, []).append((method, message))
+
+    async def write(self, destination: str, writes: list):
+        for method, message in writes:
+            await getattr(self.channel_layer, method)(destination, message)
+
+    async def flush(self) -> dict:
+        """Write all collected messages, return destination -> exception of failed destinations"""
+        writes, self.writes = self.writes, {}
+        results = await asyncio.gather(
+            *[self.write(destination, items) for destination, items in writes.items()], return_exceptions=True
+        )
+        return {
+            destination: result for destination, result in zip(writes, results) if isinstance(result, Exception)
+        }
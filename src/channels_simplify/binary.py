@@ -0,0 +1,94 @@
+import struct
+
+HEADER = struct.Struct('!BBHI')  #: Version, flags, event name length, stream id
+VERSION = 1
+CREDIT = struct.Struct('!I')  #: Body of ack frame, bytes peer may send more
+SERVER_STREAM = 0x80000000  #: Bit of stream ids opened by server, client use ids without it
+
+
+class Flags:
+    """Binary frame flags"""
+    fin = 1  #: Last chunk of stream
+    ack = 2  #: Flow control frame, body is credit for more bytes of stream
+    compressed = 4  #: Body is event json compressed with connection dictionary, see compression module
+    zstd = 8  #: Compressed body is zstd frame, raw deflate if not set
+
+
+class BinaryFrame:
+    """
+    Binary websocket frame
+
+    Header (8 bytes): version, flags, event name length, stream id; then utf-8 event name and body
+    """
+    __slots__ = ('flags', 'name', 'stream_id', 'body')
+
+    def __init__(self, flags: int, name: str, stream_id: int, body: memoryview):
+        self.flags = flags
+        self.name = name  #: Event name, e.g. test.binary.echo
+        self.stream_id = stream_id
+        self.body = body  #: View into received frame, not copied
+
+    @classmethod
+    def parse(cls, data: bytes) -> 'BinaryFrame':
+        if len(data) < HEADER.size:
+            raise ValueError('Binary frame too short')
+        version, flags, name_length, stream_id = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f'Binary frame version {version} not supported')
+        view = memoryview(data)
+        name = bytes(view[HEADER.size:HEADER.size + name_length]).decode('utf-8')
+        return cls(flags, name, stream_id, view[HEADER.size + name_length:])
+
+    @staticmethod
+    def pack(name: str, stream_id: int, body=b'', flags: int = 0) -> bytes:
+        name = name.encode('utf-8')
+        return b''.join((HEADER.pack(VERSION, flags, len(name), stream_id), name, body))
+
+
+class Stream:
+    """
+    Chunked binary stream of one connection with credit based flow control
+
+    Receiver grant window bytes at start and acknowledge consumed bytes when half of window is consumed,
+    sender never send more bytes than it has credit
+    """
+    __slots__ = ('id', 'name', 'window', 'credit', 'unacked', 'received', 'finished', 'pending', 'event')
+
+    def __init__(self, stream_id: int, name: str, window: int):
+        self.id = stream_id
+        self.name = name  #: Event name of stream
+        self.window = window  #: Max bytes in flight
+        self.credit = window  #: Bytes which may be sent now
+        self.unacked = 0  #: Received bytes not acknowledged yet
+        self.received = 0  #: Total received bytes
+        self.finished = False  #: Last chunk received
+        self.pending = None  #: Not sent part of outgoing stream
+        self.event = None  #: Event instance which catch chunks of incoming stream
+
+    def consume(self, size: int) -> bool:
+        """Account received chunk, False if sender exceeded its credit"""
+        if size > self.credit:
+            return False
+        self.credit -= size
+        self.unacked += size
+        self.received += size
+        return True
+
+    def acknowledge(self) -> int:
+        """Credit to grant sender, 0 if it is too early to acknowledge"""
+        if self.finished or self.unacked < self.window // 2:
+            return 0
+        granted, self.unacked = self.unacked, 0
+        self.credit += granted
+        return granted
+
+    def chunks(self, chunk_size: int):
+        """Take chunks of outgoing data allowed by credit, yield (chunk, is last)"""
+        while self.pending is not None and self.credit > 0:
+            size = min(chunk_size, self.credit, len(self.pending))
+            chunk, self.pending = self.pending[:size], self.pending[size:]
+            self.credit -= size
+            last = not len(self.pending)
+            if last:
+                self.pending = None
+            yield chunk, last
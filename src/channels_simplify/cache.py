@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+class Flight:
+    """Computation of one key in progress, concurrent callers of same key wait for it"""
+    __slots__ = ('owner', 'done', 'result')
+
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.done = threading.Event()
+        self.result = None
+
+
+class ResponseCache:
+    """
+    LRU cache of responses of query-style events, see :attr:`SimpleEvent.cache_response`
+
+    Keyed by event class path, user id if response is per user and normalized payload,
+    concurrent requests with same key are coalesced so response is computed once
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size  #: Max cached responses, least recently used are evicted first
+        self.entries = OrderedDict()  #: Key -> (expires at, response)
+        self.flights = {}  #: Key -> Flight
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  #: Requests which waited for computation of same key
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(event_name: str, payload: dict, user_id=None) -> tuple:
+        return event_name, user_id, json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+
+    def stats(self) -> dict:
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced}
+
+    def get(self, key: tuple):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires < time.monotonic():
+            self.entries.pop(key, None)
+            return None
+        self.entries.move_to_end(key)
+        return response
+
+    def put(self, key: tuple, response, ttl: float):
+        self.entries[key] = (time.monotonic() + ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def get_or_compute(self, key: tuple, ttl: float, compute: Callable):
+        """
+        Cached response of key or result of compute, None results are not cached
+
+        Caller which find computation of same key in progress wait for it,
+        if it ends without response caller compute by itself
+        """
+        with self.lock:
+            response = self.get(key)
+            if response is not None:
+                self.hits += 1
+                return response
+            flight = self.flights.get(key)
+            if flight is None or flight.owner == threading.get_ident():
+                flight = self.flights[key] = Flight()
+                self.misses += 1
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+        if not owner:
+            flight.done.wait()
+            if flight.result is not None:
+                return flight.result
+            return compute()
+        try:
+            flight.result = compute()
+            if flight.result is not None:
+                with self.lock:
+                    self.put(key, flight.result, ttl)
+            return flight.result
+        finally:
+            with self.lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.done.set()
+
+    def invalidate(self, event_name: str = None, user_id=None):
+        """Drop cached responses of event, of user, of both or all"""
+        with self.lock:
+            for key in list(self.entries):
+                if (event_name is None or key[0] == event_name) and (user_id is None or key[1] == user_id):
+                    del self.entries[key]
+
+
+response_cache = ResponseCache()  #: Response cache of process
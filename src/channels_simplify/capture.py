@@ -0,0 +1,150 @@
+import os
+import random
+import struct
+import threading
+import time
+from typing import Iterable, Iterator, NamedTuple
+
+MAGIC = b'CSCAP\x02'  #: Capture file header, version 2
+RECORD = struct.Struct('!BdIQI')  #: Kind, seconds since capture start, connection id, user id, data length
+
+
+class RecordKind:
+    connect = 1  #: Data is connection path
+    text = 2  #: Data is utf-8 text frame
+    bytes = 3  #: Data is binary frame
+    disconnect = 4
+
+
+class Record(NamedTuple):
+    kind: int
+    timestamp: float
+    connection: int
+    user: int  #: 0 for anonymous user
+    data: bytes
+
+
+class TrafficRecorder:
+    """
+    Record inbound websocket traffic of sampled connections to append-only file
+
+    Sampling is per connection, so replay keep whole sessions and their concurrency shape,
+    consumers check only active flag while recorder is off, file is flushed on disable.
+    Recording appended to existing file continue its connection ids and timestamps, so sessions never merge
+
+    >>> recorder.enable(output='/tmp/traffic-{pid}.cap', sample_rate=0.1, duration=600)
+    """
+
+    def __init__(self):
+        self.active = False  #: Checked on every connect, keep it cheap
+        self.consumers = None  #: Consumer class names to record, all if None
+        self.sample_rate = 1.0  #: Part of new connections to record
+        self.until = 0.0
+        self.started = 0.0
+        self.output = None
+        self.file = None
+        self.connections = 0  #: Recorded connections in current window
+        self.lock = threading.Lock()
+
+    def enable(self, output: str = 'channels-simplify-{pid}.cap', sample_rate: float = 1.0, duration: float = 600,
+               consumers: Iterable[str] = None):
+        """Start recording, {pid} in output is replaced so every process write its own file"""
+        self.disable()
+        with self.lock:
+            self.output = output.format(pid=os.getpid())
+            offset, connections, timestamp = capture_tail(self.output)
+            self.file = open(self.output, 'r+b' if offset else 'wb')
+            if offset:
+                # Cut incomplete last record of interrupted recording
+                self.file.truncate(offset)
+                self.file.seek(offset)
+            else:
+                self.file.write(MAGIC)
+            self.consumers = set(consumers) if consumers else None
+            self.sample_rate = sample_rate
+            self.started = time.monotonic() - timestamp
+            self.until = time.monotonic() + duration
+            self.connections = connections
+            self.active = True
+
+    def disable(self) -> [str, None]:
+        """Stop recording and close file, return file path"""
+        with self.lock:
+            return self.close()
+
+    def close(self) -> [str, None]:
+        """Stop recording with lock held"""
+        if not self.active:
+            return None
+        self.active = False
+        self.file.close()
+        self.file = None
+        return self.output
+
+    def write(self, kind: int, connection: int, user: int, data: bytes = b''):
+        with self.lock:
+            if not self.active:
+                return
+            now = time.monotonic()
+            if now > self.until:
+                self.close()
+                return
+            timestamp = now - self.started
+            self.file.write(RECORD.pack(kind, timestamp, connection, user, len(data)))
+            self.file.write(data)
+
+    def connected(self, consumer) -> [tuple, None]:
+        """Start recording of connection if it is sampled, return its (connection id, user id)"""
+        if time.monotonic() > self.until:
+            self.disable()
+            return None
+        if self.consumers is not None and consumer.__class__.__name__ not in self.consumers:
+            return None
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        with self.lock:
+            self.connections += 1
+            connection = self.connections
+        user = getattr(consumer.scope.get('user'), 'id', None) or 0
+        self.write(RecordKind.connect, connection, user, consumer.scope.get('path', '').encode('utf-8'))
+        return connection, user
+
+    def frame(self, connection: int, user: int, text_data: str = None, bytes_data: bytes = None):
+        if bytes_data is not None:
+            self.write(RecordKind.bytes, connection, user, bytes_data)
+        elif text_data is not None:
+            self.write(RecordKind.text, connection, user, text_data.encode('utf-8'))
+
+    def disconnected(self, connection: int, user: int):
+        self.write(RecordKind.disconnect, connection, user)
+
+
+def capture_tail(path: str) -> tuple:
+    """Offset after last complete record, last connection id and last timestamp of capture file, zeros if no file"""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return 0, 0, 0.0
+    offset, connections, timestamp = len(MAGIC), 0, 0.0
+    for record in read_capture(path):
+        offset += RECORD.size + len(record.data)
+        connections = max(connections, record.connection)
+        timestamp = record.timestamp
+    return offset, connections, timestamp
+
+
+def read_capture(path: str) -> Iterator[Record]:
+    """Records of capture file in recorded order, incomplete last record is skipped"""
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not traffic capture')
+        while True:
+            header = file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, timestamp, connection, user, length = RECORD.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            yield Record(kind, timestamp, connection, user, data)
+
+
+recorder = TrafficRecorder()  #: Traffic recorder of process
@@ -0,0 +1,132 @@
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable
+
+from .binary import BinaryFrame, Flags
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Codec(ABC):
+    """
+    Compress large outgoing events with dictionary shared with client
+
+    Compressed event is sent as binary frame with compressed flag, body is event json.
+    Frames are memoized by event json, so broadcast delivered to many connections of process
+    is compressed once, not once per receiver
+    """
+
+    name = None  #: Codec name sent to client
+    flags = Flags.compressed
+    memo_size = 64  #: Compressed frames kept for other receivers of same event
+
+    def __init__(self, dictionary: bytes = b'', level: int = None):
+        self.dictionary = dictionary
+        self.level = level
+        self.dictionary_id = format(zlib.crc32(dictionary), '08x')  #: Client may cache dictionary by it
+        self.memo = OrderedDict()  #: Event json -> binary frame
+        self.lock = threading.Lock()
+        self.compressed = 0  #: Events compressed
+        self.reused = 0  #: Events sent with frame compressed for other receiver
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        ...
+
+    def frame(self, event_name: str, text: str) -> bytes:
+        with self.lock:
+            frame = self.memo.get(text)
+            if frame is not None:
+                self.memo.move_to_end(text)
+                self.reused += 1
+                return frame
+        data = text.encode('utf-8')
+        frame = BinaryFrame.pack(event_name, 0, self.compress(data), self.flags)
+        with self.lock:
+            self.memo[text] = frame
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+            self.compressed += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(frame)
+        return frame
+
+    def stats(self) -> dict:
+        return {
+            'compressed': self.compressed,
+            'reused': self.reused,
+            'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+        }
+
+
+class ZlibCodec(Codec):
+    """Raw deflate with preset dictionary, client inflate with zdict, e.g. pako inflateRaw with dictionary"""
+    name = 'zlib'
+
+    def __init__(self, dictionary: bytes = b'', level: int = 6):
+        # Deflate window is 32 KB, only dictionary tail is used
+        super(ZlibCodec, self).__init__(dictionary[-32 * 1024:], level)
+        # Dictionary is loaded once, every event is compressed with copy of primed compressor
+        self.primed = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=self.dictionary) if self.dictionary \
+            else zlib.compressobj(level, zlib.DEFLATED, -15)
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = self.primed.copy()
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = zlib.decompressobj(-15, zdict=self.dictionary) if self.dictionary else zlib.decompressobj(-15)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class ZstdCodec(Codec):
+    """Zstd with trained dictionary, requires zstandard package"""
+    name = 'zstd'
+    flags = Flags.compressed | Flags.zstd
+
+    def __init__(self, dictionary: bytes = b'', level: int = 3):
+        if zstandard is None:
+            raise ImportError('ZstdCodec requires zstandard, pip install zstandard')
+        super(ZstdCodec, self).__init__(dictionary, level)
+        self.zstd_dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self.local = threading.local()
+
+    def compressor(self):
+        # Zstd compressor is not thread safe, keep one per thread
+        compressor = getattr(self.local, 'compressor', None)
+        if compressor is None:
+            compressor = self.local.compressor = zstandard.ZstdCompressor(level=self.level,
+                                                                          dict_data=self.zstd_dictionary)
+        return compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor().compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor(dict_data=self.zstd_dictionary).decompress(data)
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = 32 * 1024, codec: str = 'zlib') -> bytes:
+    """
+    Dictionary from sample event jsons, e.g. recorded with capture or dumped from production
+
+    Zstd dictionary is trained by zstandard, zlib dictionary is tail of samples,
+    deflate find matches nearest to the end of dictionary cheapest, so latest samples go last
+    """
+    samples = list(samples)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError('Zstd dictionary training requires zstandard, pip install zstandard')
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    return b''.join(samples)[-size:]
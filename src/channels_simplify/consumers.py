@@ -5,11 +5,17 @@ Simple websocket consumer
 """
 
 from __future__ import annotations
+import asyncio
+import base64
+import copy
+import sys
+import time
 import uuid
+from dataclasses import dataclass
 from inspect import isclass
 from typing import Callable as Cl, Any
 
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from channels.consumer import get_handler_name
 from channels.db import database_sync_to_async
 from channels.generic.websocket import JsonWebsocketConsumer
@@ -18,11 +24,25 @@ from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 from django.core.cache import cache
-
+from django.db import close_old_connections
+
+from .admission import admission, CloseCode
+from .batch import LayerBatch
+from .binary import BinaryFrame, Stream, Flags, CREDIT, SERVER_STREAM
+from .cache import response_cache
+from .capture import recorder
+from .db import db_usage
 from .decoratos import auth, safe
+from .lanes import Priority, dispatch_lanes
+from .outbound import OutboundQueue, OutboundPolicy
+from .profiling import profiler
+from .publisher import publish, audience_destinations
+from .replay import ReplayBuffer, get_replay_buffer, record_sent
+from .topics import topic_index, topic_router, topic_messages
 from .signatures import ResponsePayload, Payload, Event, TargetsEnum, Message, EventSystem, \
-    MessageSystem, TargetResolver, LookupUser
-from .utils import camel_to_snake, user_cache_key, camel_to_dot, get_system_cache
+    MessageSystem, TargetResolver, LookupUser, TopicPayload
+from .utils import camel_to_snake, user_cache_key, camel_to_dot, get_system_cache, dot_to_snake, output_path, \
+    user_group
 
 User: AbstractUser = get_user_model()
 
@@ -35,6 +55,16 @@ class SimpleEvent:
     target = TargetsEnum.for_all  #: Who must receive this name
     consumer = None  #: Consumer object instance
     hidden = False  #: If hidden, event can't be called from client side
+    replay = True  #: If replay, event is kept in replay buffer for reconnected clients
+    local = False  #: If local, event is caught by initiator consumer only, without broadcast group round trip
+    uses_db = None  #: If False, dispatch skip database connections housekeeping, detected by queries if None
+    stream_window = 256 * 1024  #: Bytes of binary stream client may send before server acknowledge them
+    conflate = None  #: Payload field, slow client receive only latest not sent event per field value (True - per event)
+    cache_response = None  #: Seconds to reuse event returned by initiator_catch for same payload, not cached if None
+    cache_per_user = False  #: If cache_per_user, cached response is reused only for same user
+    invalidates = ()  #: Event classes whose cached responses are dropped when initiator of this event catch it
+    compress = True  #: If compress, event above consumer compression threshold is sent compressed
+    priority = None  #: Lane of event in dispatch and outbound queues, broadcast to all is bulk, others interactive if None
 
     def before_catch(self, message: Message, payload: request_payload_type):
         """
@@ -63,6 +93,20 @@ class SimpleEvent:
         Use if you need mutate DB or any different data
         """
 
+    def binary_catch(self, stream: Stream, chunk: memoryview):
+        """
+        Catch chunk of binary stream sent by client, chunk is view into received frame, copy it if you need keep it
+        stream.finished is True for last chunk
+        """
+        ...
+
+    def audience(self, message: Message, payload: request_payload_type):
+        """
+        Resolve recipients once on initiator side if target is for_audience
+        Return users queryset, list of users, user ids or channel names, event is delivered only to them
+        """
+        return []
+
     def __init__(self, consumer: SimpleConsumer, content=None, payload: Payload = None):
         self.consumer: SimpleConsumer = consumer if consumer else self.consumer
         if not self.consumer:
@@ -83,13 +127,14 @@ class SimpleEvent:
         content = self.content
         return Event(name=content.pop('type'), system=content.pop('system'), payload=payload)
 
-    def fire_client(self):
+    def fire_client(self, replay: bool = False):
+        """Catch event by consumer, replayed event is caught again without before_catch"""
         self.consumer.send_broadcast(
             self.content,
             do_for_target=self.target_catch,
-            do_for_initiator=self.initiator_catch,
+            do_for_initiator=self.catch_initiator,
             target=self.target,
-            do_before=self.before_catch,
+            do_before=None if replay else self.before_catch,
             payload_type=self.request_payload_type
         )
 
@@ -106,6 +151,54 @@ class SimpleEvent:
         event: Event = self.return_event(payload=payload)
         self.consumer.send_to_group(event)
 
+    def catch_initiator(self, message: Message, payload: request_payload_type):
+        """Drop cached responses of invalidates once per event, on initiator side only, then catch initiator block"""
+        for event_class in self.invalidates:
+            event_class.invalidate_cache()
+        catch = self.cached_initiator_catch if self.cache_response else self.initiator_catch
+        return catch(message, payload)
+
+    def cached_initiator_catch(self, message: Message, payload: request_payload_type):
+        """Catch initiator block once per payload while cache_response seconds pass, others get same response"""
+        system = self.content.get('system')
+        user_id = getattr(message.user, 'id', None) if self.cache_per_user else None
+        key = response_cache.key(self.cache_name(), Event.serialize_payload(payload), user_id)
+        response = response_cache.get_or_compute(
+            key, self.cache_response, lambda: self.cacheable_response(self.initiator_catch(message, payload))
+        )
+        if isinstance(response, Event):
+            return Event(name=response.name, system=system, payload=response.payload)
+        return dict(response) if response is not None else None
+
+    @staticmethod
+    def cacheable_response(response: [Event, dict, None]) -> [Event, dict, None]:
+        """Copy of response without system data of initiator"""
+        if isinstance(response, Event):
+            return Event(name=response.name, system={}, payload=copy.deepcopy(Event.serialize_payload(response.payload)))
+        return copy.deepcopy(response)
+
+    @classmethod
+    def lane(cls) -> int:
+        if cls.priority is not None:
+            return cls.priority
+        return Priority.bulk if cls.target == TargetsEnum.for_all else Priority.interactive
+
+    @classmethod
+    def cache_name(cls) -> str:
+        """Response cache name of event, same named events of different consumers are cached apart"""
+        return f'{cls.__module__}.{cls.__qualname__}'
+
+    @classmethod
+    def invalidate_cache(cls, user: [User, int] = None):
+        """Drop cached responses of event in process, of one user only if provided"""
+        user_id = getattr(user, 'id', user)
+        response_cache.invalidate(cls.cache_name(), user_id)
+
+    @classmethod
+    def publish(cls, payload: [Payload, dict] = None, groups=(), users=(), channels=(), topics=()) -> int:
+        """Fire event from views or background jobs without consumer, see :func:`publisher.publish`"""
+        return publish(cls, payload, groups=groups, users=users, channels=channels, topics=topics)
+
     def parse_content(self, content: dict, payload: [Payload, dict]):
         event_name = camel_to_dot(self.__class__.__name__)
 
@@ -122,11 +215,120 @@ class SimpleEvent:
         return content
 
 
+class ProfileEvents(SimpleEvent):
+    """
+    Admin only event, profile selected events or consumer classes of process for time window
+
+    Attach it to consumer if you need, ``ProfileEvents = ProfileEvents``, stats are dumped to output file
+    in CHANNELS_SIMPLIFY_OUTPUT_DIR when window ends or when event fired with enable false
+    """
+    @dataclass
+    class ProfilePayload(Payload):
+        enable: bool = True  #: Start or stop profiling
+        events: list = None  #: Event names, e.g. test.event.all.and.self, all if not provided
+        consumers: list = None  #: Consumer class names, all if not provided
+        duration: float = 60  #: Profiling window in seconds
+        sample_rate: float = 1.0  #: Part of matched dispatches to profile
+        output: str = 'channels-simplify.prof'  #: Stats file name
+
+    request_payload_type = ProfilePayload
+    target = TargetsEnum.for_initiator
+    replay = False
+    local = True
+
+    def initiator_catch(self, message: Message, payload: request_payload_type):
+        if not getattr(message.user, 'is_superuser', False):
+            self.consumer.Error(payload=ResponsePayload.ActionNotExist(), consumer=self.consumer).fire()
+            return
+        if payload.enable:
+            output = output_path(payload.output)
+            if not output:
+                self.consumer.Error(payload=ResponsePayload.OutputWrong(output=payload.output), consumer=self.consumer).fire()
+                return
+            profiler.enable(
+                events=payload.events,
+                consumers=payload.consumers,
+                duration=payload.duration,
+                sample_rate=payload.sample_rate,
+                output=output
+            )
+            return self.return_event(payload={'profiling': True, 'output': output})
+        return self.return_event(payload={'profiling': False, 'output': profiler.disable()})
+
+
+class CaptureTraffic(SimpleEvent):
+    """
+    Admin only event, record inbound traffic of sampled connections for replay with benchmarks.replay_traffic
+
+    Attach it to consumer if you need, ``CaptureTraffic = CaptureTraffic``, file is written to
+    CHANNELS_SIMPLIFY_OUTPUT_DIR, recording stops when window ends or when event fired with enable false
+    """
+    @dataclass
+    class CapturePayload(Payload):
+        enable: bool = True  #: Start or stop recording
+        consumers: list = None  #: Consumer class names, all if not provided
+        duration: float = 600  #: Recording window in seconds
+        sample_rate: float = 1.0  #: Part of new connections to record
+        output: str = 'channels-simplify-{pid}.cap'  #: Capture file name, {pid} is replaced with process id
+
+    request_payload_type = CapturePayload
+    target = TargetsEnum.for_initiator
+    replay = False
+    local = True
+
+    def initiator_catch(self, message: Message, payload: request_payload_type):
+        if not getattr(message.user, 'is_superuser', False):
+            self.consumer.Error(payload=ResponsePayload.ActionNotExist(), consumer=self.consumer).fire()
+            return
+        if payload.enable:
+            output = output_path(payload.output)
+            try:
+                if not output:
+                    raise ValueError(payload.output)
+                recorder.enable(
+                    output=output,
+                    sample_rate=payload.sample_rate,
+                    duration=payload.duration,
+                    consumers=payload.consumers
+                )
+            except ValueError:
+                # Not a file name or existing file is not traffic capture of current version
+                self.consumer.Error(payload=ResponsePayload.OutputWrong(output=payload.output), consumer=self.consumer).fire()
+                return
+            return self.return_event(payload={'capturing': True, 'output': recorder.output})
+        return self.return_event(payload={'capturing': False, 'output': recorder.disable()})
+
+
 class SimpleConsumer(JsonWebsocketConsumer):
     broadcast_group = None  #: Group to join after connect
     authed = False  #: Check connected user is authed, if not - close connect
     custom_target_resolver = {}  #: If you need define rules for lookup users who want to receive events (target)
     headers = {}  #: Response headers
+    replay_buffer_size = 0  #: How many recent broadcast group events keep for replay, disabled if 0
+    topics = []  #: Topics to subscribe after connect, wildcards * (one word) and # (rest of topic) allowed
+    subscriptions = frozenset()  #: Topics subscribed by connection
+    max_subscriptions = 32  #: Topics client may subscribe at once, each is kept in topic index of process
+    max_connections = None  #: Max live connections of this consumer per process, unlimited if None
+    max_pending_dispatches = None  #: Reject new connections while more dispatches of process are queued
+    max_dispatch_latency = None  #: Reject new connections while average dispatch latency in seconds above it
+    retry_after = 5  #: Seconds rejected client should wait before reconnect
+    outbound_queue_size = None  #: Max pending outbound messages of slow client, not queued if None
+    outbound_policy = OutboundPolicy.drop_oldest  #: What to do when outbound queue is full
+    outbound = None  #: Outbound queue of connection, has depth metrics
+    streams = None  #: Binary streams of connection in progress, stream id -> Stream
+    stream_sequence = 0  #: Last id of stream opened by server
+    max_streams = 16  #: Streams client may send at once, each hold up to stream window of event in memory
+    batch_layer_writes = True  #: Collect channel layer writes while handle message and flush them at once
+    layer_batch = None  #: Channel layer writes of message in progress
+    control_messages = frozenset({'websocket.connect', 'websocket.disconnect', 'drain.close'})  #: Control lane
+    event_index = {}  #: Event name -> event class, hidden events included
+    connected_at = None  #: Monotonic time of connect
+    received_messages = 0  #: Messages dispatched to connection, from client and channel layer
+    sent_messages = 0  #: Messages sent to client
+    inflight = None  #: (message type, monotonic start time) of dispatch in progress
+    compression = None  #: Codec of large outgoing events shared by connections, e.g. ZlibCodec(dictionary)
+    compression_threshold = 4096  #: Min length of event json to send it compressed
+    capture = None  #: (connection id, user id) of connection in traffic capture, None if not recorded
 
     def __init__(self):
         self.channel_layer = get_channel_layer()
@@ -134,7 +336,11 @@ class SimpleConsumer(JsonWebsocketConsumer):
         self.hide_events()
 
     def __call__(self, scope, receive, send):
+        admission.loop = asyncio.get_running_loop()
         self.inject_user(scope)
+        if self.outbound_queue_size:
+            self.outbound = OutboundQueue(send, self.outbound_queue_size, self.outbound_policy)
+            return self.outbound.serve(super(SimpleConsumer, self).__call__(scope, receive, self.outbound.put))
         return super(SimpleConsumer, self).__call__(scope, receive, send)
 
     def accept(self, subprotocol=None):
@@ -150,6 +356,38 @@ class SimpleConsumer(JsonWebsocketConsumer):
             scope['user'] = AnonymousUser()
         return scope
 
+    def websocket_connect(self, message):
+        code = admission.reject_code(self)
+        if code:
+            self.reject(code)
+            return
+        super(SimpleConsumer, self).websocket_connect(message)
+        self.connected_at = time.monotonic()
+        admission.register(self)
+        if recorder.active:
+            self.capture = recorder.connected(self)
+
+    def websocket_disconnect(self, message):
+        admission.unregister(self)
+        if self.capture:
+            recorder.disconnected(*self.capture)
+        super(SimpleConsumer, self).websocket_disconnect(message)
+
+    def reject(self, code: int):
+        self.accept()
+        self.close_retry(code)
+
+    def close_retry(self, code: int):
+        """Close connection with retry-after close code, client also receive error with retry_after hint"""
+        payload = ResponsePayload.ServerDraining() if code == CloseCode.service_restart else \
+            ResponsePayload.ServerOverloaded(retry_after=self.retry_after)
+        self.Error(payload=payload, consumer=self).fire()
+        self.close(code)
+
+    def drain_close(self, message):
+        """Channel layer handler, close connection while process drain"""
+        self.close_retry(CloseCode.service_restart)
+
     def before_connect(self):
         ...
 
@@ -157,7 +395,12 @@ class SimpleConsumer(JsonWebsocketConsumer):
     def connect(self):
         self.before_connect()
         self.cache_system()
+        self.join_user_group()
+        if self.compression:
+            self.send_compression()
         self.join_group(self.broadcast_group)
+        for topic in self.topics:
+            self.subscribe_topic(topic)
         self.after_connect()
 
     def after_connect(self):
@@ -168,11 +411,73 @@ class SimpleConsumer(JsonWebsocketConsumer):
 
     def disconnect(self, code):
         self.before_disconnect()
+        self.leave_user_group()
+        for topic in self.subscriptions:
+            topic_router.unsubscribe(topic, self.channel_name)
+        self.subscriptions = frozenset()
 
     def send_json(self, content, close=False):
         if 'system' in content:
-            content.pop('system')
-        super(SimpleConsumer, self).send_json(content, close)
+            system = content.pop('system')
+            if self.replay_buffer_size:
+                self.expose_event_id(content, system)
+        self.sent_messages += 1
+        if not self.outbound and not self.compression:
+            super(SimpleConsumer, self).send_json(content, close)
+            return
+        message = self.json_message(content)
+        if self.outbound:
+            event_class = self.event_index.get(content.get('event'))
+            if event_class:
+                message[OutboundQueue.priority_field] = event_class.lane()
+            key = self.conflate_key(content) if self.outbound_policy == OutboundPolicy.conflate else None
+            if key is not None:
+                message[OutboundQueue.key_field] = key
+        self.base_send(message)
+        if close:
+            self.close()
+
+    def json_message(self, content: dict) -> dict:
+        """ASGI send message of event, compressed binary frame if event json is above compression threshold"""
+        text = self.encode_json(content)
+        if self.compression and len(text) >= self.compression_threshold:
+            event_class = self.event_index.get(content.get('event'))
+            if getattr(event_class, 'compress', True):
+                return {'type': 'websocket.send', 'bytes': self.compression.frame(content.get('event', ''), text)}
+        return {'type': 'websocket.send', 'text': text}
+
+    def send_compression(self):
+        """
+        Send codec and dictionary id to client, it must inflate compressed binary frames with them
+
+        Dictionary itself is not sent on every connect, client which has not cached it by id
+        request it with compression.dictionary event
+        """
+        self.Compression(consumer=self).fire(payload={
+            'codec': self.compression.name,
+            'dictionary_id': self.compression.dictionary_id,
+            'threshold': self.compression_threshold,
+        })
+
+    def conflate_key(self, content: dict):
+        """Conflate key of outgoing event declared by :attr:`SimpleEvent.conflate`"""
+        conflate = getattr(self.event_index.get(content.get('event')), 'conflate', None)
+        if not conflate:
+            return None
+        if conflate is True:
+            return content['event']
+        return f'{content["event"]}:{content.get("payload", {}).get(conflate)}'
+
+    def expose_event_id(self, content, system: [dict, EventSystem]):
+        """Client must know event id of replayable events to request replay after reconnect"""
+        event_id = system.get('event_id') if isinstance(system, dict) else system.event_id
+        buffer = self.get_replay_buffer()
+        if buffer and event_id in buffer:
+            content['event_id'] = event_id
+
+    def get_replay_buffer(self) -> [ReplayBuffer, None]:
+        if self.replay_buffer_size and self.broadcast_group:
+            return get_replay_buffer(self.broadcast_group, self.replay_buffer_size)
 
     def cache_system(self):
         if not self.get_user().is_anonymous:
@@ -186,12 +491,36 @@ class SimpleConsumer(JsonWebsocketConsumer):
     def join_group(self, group_name: str):
         if group_name:
             self.broadcast_group = group_name
-            async_to_sync(self.channel_layer.group_add)(group_name, self.channel_name)
+            self.layer_write('group_add', group_name, self.channel_name)
 
     def leave_group(self, group_name: str):
         if group_name:
             self.broadcast_group = None
-            async_to_sync(self.channel_layer.group_discard)(group_name, self.channel_name)
+            self.layer_write('group_discard', group_name, self.channel_name)
+
+    def join_user_group(self):
+        """Join group of connection user, events sent to user reach all his connections"""
+        if not self.get_user().is_anonymous:
+            self.layer_write('group_add', user_group(self.get_user()), self.channel_name)
+
+    def leave_user_group(self):
+        if not self.get_user().is_anonymous:
+            self.layer_write('group_discard', user_group(self.get_user()), self.channel_name)
+
+    def subscribe_topic(self, topic: str) -> bool:
+        if not topic_index.validate(topic):
+            return False
+        topic_router.subscribe(topic, self.channel_name)
+        self.subscriptions = self.subscriptions | {topic}
+        return True
+
+    def unsubscribe_topic(self, topic: str):
+        topic_router.unsubscribe(topic, self.channel_name)
+        self.subscriptions = self.subscriptions - {topic}
+
+    def can_subscribe(self, topic: str) -> bool:
+        """Override to check client may subscribe to topic pattern, e.g. deny # or topics of other users"""
+        return True
 
     def get_systems(self) -> EventSystem:
         return EventSystem(
@@ -202,23 +531,200 @@ class SimpleConsumer(JsonWebsocketConsumer):
 
     @safe
     def receive(self, *arg, **kwargs):
+        if self.capture:
+            recorder.frame(*self.capture, text_data=kwargs.get('text_data'), bytes_data=kwargs.get('bytes_data'))
+        if kwargs.get('bytes_data') is not None:
+            self.receive_bytes(kwargs['bytes_data'])
+            return
         super().receive(*arg, **kwargs)
 
+    def receive_bytes(self, data: bytes):
+        """Binary frame, chunk of stream is passed to :func:`SimpleEvent.binary_catch` as memoryview"""
+        frame = BinaryFrame.parse(data)
+        if self.streams is None:
+            self.streams = {}
+        if frame.flags & Flags.ack:
+            stream = self.streams.get(frame.stream_id)
+            if stream and stream.pending is not None:
+                stream.credit += CREDIT.unpack_from(frame.body)[0]
+                self.flush_stream(stream)
+            return
+        if frame.stream_id & SERVER_STREAM:
+            self.Error(payload=ResponsePayload.StreamWrong(stream_id=frame.stream_id), consumer=self).fire()
+            return
+        stream = self.streams.get(frame.stream_id)
+        if not stream:
+            handler: Any = getattr(self, dot_to_snake(frame.name), None)
+            if not isclass(handler) or not issubclass(handler, SimpleEvent):
+                self.Error(payload=ResponsePayload.ActionNotExist(), consumer=self).fire()
+                return
+            if sum(1 for stream_id in self.streams if not stream_id & SERVER_STREAM) >= self.max_streams:
+                self.Error(
+                    payload=ResponsePayload.StreamLimitExceeded(stream_id=frame.stream_id, max_streams=self.max_streams),
+                    consumer=self
+                ).fire()
+                return
+            stream = self.streams[frame.stream_id] = Stream(frame.stream_id, frame.name, handler.stream_window)
+            stream.event = handler(consumer=self)
+        if not stream.consume(len(frame.body)):
+            del self.streams[frame.stream_id]
+            self.Error(payload=ResponsePayload.StreamWindowExceeded(stream_id=stream.id), consumer=self).fire()
+            return
+        stream.finished = bool(frame.flags & Flags.fin)
+        stream.event.binary_catch(stream, frame.body)
+        if stream.finished:
+            del self.streams[frame.stream_id]
+            return
+        credit = stream.acknowledge()
+        if credit:
+            self.send(bytes_data=BinaryFrame.pack(stream.name, stream.id, CREDIT.pack(credit), Flags.ack))
+
+    def send_stream(self, event_name: str, data, chunk_size: int = 16 * 1024, window: int = 256 * 1024) -> Stream:
+        """
+        Send bytes like data to client as chunked binary stream, data is sliced without copy
+
+        Client receive chunks of at most window bytes and must acknowledge them to get the rest
+        """
+        if self.streams is None:
+            self.streams = {}
+        self.stream_sequence += 1
+        stream = Stream(SERVER_STREAM | self.stream_sequence, event_name, window)
+        stream.pending = memoryview(data).cast('B')
+        self.streams[stream.id] = stream
+        self.flush_stream(stream, chunk_size)
+        return stream
+
+    def flush_stream(self, stream: Stream, chunk_size: int = 16 * 1024):
+        for chunk, last in stream.chunks(chunk_size):
+            self.send(bytes_data=BinaryFrame.pack(stream.name, stream.id, chunk, Flags.fin if last else 0))
+        if stream.pending is None:
+            self.streams.pop(stream.id, None)
+
     @safe
     def send(self, *arg, **kwargs):
+        self.sent_messages += 1
         super().send(*arg, **kwargs)
 
+    async def dispatch(self, content):
+        started = admission.dispatch_started()
+        try:
+            async with dispatch_lanes.slot(self.message_priority(content)):
+                self.inflight = (content.get('type'), time.monotonic())
+                handler = getattr(self, get_handler_name(content), None)
+                if db_usage.needs_db(handler):
+                    await self.dispatch_db(content, handler)
+                else:
+                    await self.dispatch_free(content, handler)
+        finally:
+            self.inflight = None
+            self.received_messages += 1
+            admission.dispatch_finished(started)
+
+    def message_priority(self, content: dict) -> int:
+        """Dispatch lane of message, frames from client are interactive until parsed"""
+        message_type = content.get('type')
+        if message_type in self.control_messages:
+            return Priority.control
+        event_class = self.event_index.get(message_type)
+        return event_class.lane() if event_class else Priority.interactive
+
     @database_sync_to_async
-    def dispatch(self, content):
+    def dispatch_db(self, content, handler=None):
+        """Dispatch with closing of old database connections before and after"""
+        if db_usage.detecting(handler):
+            with db_usage.detect(handler):
+                return self.dispatch_content(content)
+        self.dispatch_content(content)
+
+    @sync_to_async
+    def dispatch_free(self, content, handler=None):
+        """
+        Dispatch event which not touch database, without connections housekeeping
+
+        Queries of event detected as database free are still counted, on first query connections are cleaned up
+        after dispatch and next dispatches of event go with housekeeping
+        """
+        if db_usage.detected(handler):
+            with db_usage.detect(handler) as counter:
+                self.dispatch_content(content)
+            if counter.queries:
+                close_old_connections()
+            return
+        self.dispatch_content(content)
+
+    def dispatch_content(self, content):
+        if self.batch_layer_writes and self.layer_batch is None:
+            self.layer_batch = LayerBatch(self.channel_layer)
+            try:
+                return self.dispatch_content(content)
+            finally:
+                batch, self.layer_batch = self.layer_batch, None
+                if batch.writes:
+                    self.flush_layer_batch(batch)
+        return self.profile_call(content.get('type'), self.dispatch_handler, content)
+
+    def profile_call(self, event: str, f, *args):
+        """Call event handling under profiler if it select event"""
+        if profiler.active and profiler.match(self, event):
+            return profiler.run(f, *args)
+        return f(*args)
+
+    def layer_write(self, method: str, destination: str, message):
+        """Call channel layer method, batched while consumer handle message"""
+        self.layer_write_many(method, [destination], message)
+
+    def layer_write_many(self, method: str, destinations, message):
+        batch = self.layer_batch if self.layer_batch is not None else LayerBatch(self.channel_layer)
+        for destination in destinations:
+            batch.add(method, destination, message)
+        if batch is not self.layer_batch:
+            self.flush_layer_batch(batch)
+
+    def flush_layer_batch(self, batch: LayerBatch):
+        """Write batch, failed destinations are logged and reported to client, connection stay open"""
+        errors = async_to_sync(batch.flush)()
+        if not errors:
+            return
+        for destination, error in errors.items():
+            print(f'Channel layer write to {destination} failed: {error.__class__.__name__}: {error}', file=sys.stderr)
+        self.Error(payload=ResponsePayload.DeliveryFailed(destinations=len(errors)), consumer=self).fire()
+
+    def dispatch_handler(self, content):
         handler: Cl = getattr(self, get_handler_name(content), None)
         if isclass(handler):
             handler: Any
             if issubclass(handler, SimpleEvent):
+                if 'user' in content:
+                    content = self.as_initiator(content)
+                if handler.replay and self.replay_buffer_size and content.get('group') == self.broadcast_group:
+                    self.get_replay_buffer().record(content)
                 handler(consumer=self, content=content).fire_client()
         else:
             if handler:
                 handler(content)
 
+    def as_initiator(self, content: dict) -> dict:
+        """Event sent to user group is caught by each connection of user as by its initiator"""
+        system = {**content['system'], 'initiator_channel': self.channel_name, 'initiator_user_id': content['user']}
+        return {**content, 'system': system}
+
+    def replay_events(self, last_event_id: str = None) -> bool:
+        """
+        Send messages of broadcast group events missed after last seen event, return False if gap can't be covered
+
+        Recorded channel layer messages are caught again as by target connection, so client get messages built
+        for him, before_catch is not run again
+        """
+        buffer = self.get_replay_buffer()
+        messages = buffer.since(last_event_id) if buffer else None
+        if messages is None:
+            return False
+        for content in messages:
+            handler = self.event_index.get(content.get('type'))
+            if handler:
+                handler(consumer=self, content=content).fire_client(replay=True)
+        return True
+
     def receive_json(self, content: dict, **kwargs):
         if not self.channel_layer:
             self.Error(payload=ResponsePayload.ChannelLayerDisabled(), consumer=self).fire()
@@ -235,16 +741,46 @@ class SimpleConsumer(JsonWebsocketConsumer):
             if not action_handler:
                 self.Error(payload=ResponsePayload.ActionNotExist(), consumer=self).fire()
                 return
+            if isclass(action_handler) and action_handler.local:
+                self.profile_call(event.name, action_handler(consumer=self, content=event.to_channels()).fire_client)
+                return
+            if isclass(action_handler) and action_handler.target == TargetsEnum.for_audience:
+                self.profile_call(event.name, self.send_to_audience, action_handler, event)
+                return
         if self.broadcast_group:
             self.send_to_group(event)
         else:
             print(f'Broadcast group not specified for {self.__class__.__name__}, broadcast not sent')
 
+    def send_to_audience(self, event_class, event: Event):
+        """Resolve event recipients once on initiator side and send event only to their channels"""
+        content = event.to_channels()
+        payload, error = self.parse_payload(content, event_class.request_payload_type)
+        if error:
+            return
+        message = self.parse_message(TargetsEnum.for_audience, payload, content)
+        recipients = event_class(consumer=self, content=content).audience(message, payload)
+        channels, groups = audience_destinations(recipients)
+        if self.get_user().is_anonymous or user_group(self.get_user()) not in groups:
+            channels.add(self.channel_name)
+        self.layer_write_many('send', channels, content)
+        self.layer_write_many('group_send', groups, content)
+
+    def send_to_topic(self, event: Event, topic: str):
+        """Send event to consumers of all processes subscribed to topics matching it"""
+        for group, message in topic_messages(topic, event.to_channels()):
+            self.layer_write_many('group_send', [group], message)
+
     def send_to_group(self, event: Event, group_name: str = None):
-        if group_name or self.broadcast_group:
-            async_to_sync(
-                self.channel_layer.group_send
-            )(self.broadcast_group if not group_name else group_name, event.to_channels())
+        group_name = group_name if group_name else self.broadcast_group
+        if group_name:
+            message = {**event.to_channels(), 'group': group_name}
+            if getattr(self.event_index.get(message['type']), 'replay', False):
+                # Recorded on send too, gap is covered even if no connection of process received event
+                if group_name == self.broadcast_group:
+                    self.get_replay_buffer()
+                record_sent(group_name, message)
+            self.layer_write('group_send', group_name, message)
 
     def check_signature(self, f: Cl):
         error = False
@@ -322,17 +858,108 @@ class SimpleConsumer(JsonWebsocketConsumer):
         if message.is_target and do_for_target:
             do_for(lambda: do_for_target(message, payload))
 
-    def hide_events(self):
-        attributes = list(filter(lambda attr: not attr.startswith('_') and not attr.startswith('__'), dir(self)))
-        classes = list(filter(lambda cls: hasattr(getattr(self, cls), '__base__'), attributes))
-        events = list(filter(lambda e: issubclass(getattr(self, e), SimpleEvent), classes))
+    @classmethod
+    def hide_events(cls):
+        """Build class level table of events callable from client side, once per consumer class"""
+        if cls.__dict__.get('events_hidden'):
+            return
+        attributes = list(filter(lambda attr: not attr.startswith('_') and not attr.startswith('__'), dir(cls)))
+        classes = list(filter(lambda attr: isclass(getattr(cls, attr)), attributes))
+        events = list(filter(lambda e: issubclass(getattr(cls, e), SimpleEvent), classes))
+        cls.event_index = {}
         for event in events:
-            event_class = getattr(self, event)
+            event_class = getattr(cls, event)
+            cls.event_index[camel_to_dot(event)] = event_class
             hidden = getattr(event_class, 'hidden', False)
             if not hidden:
-                setattr(self, camel_to_snake(event), event_class)
+                setattr(cls, camel_to_snake(event), event_class)
+        cls.events_hidden = True
 
     class Error(SimpleEvent):
         """Error event"""
         request_payload_type = None
         hidden = True
+        priority = Priority.control
+
+    class Compression(SimpleEvent):
+        """Compression codec and dictionary id, sent after connect if consumer compress large events"""
+        request_payload_type = None
+        hidden = True
+        compress = False
+        priority = Priority.control
+
+    class CompressionDictionary(SimpleEvent):
+        """Client request compression dictionary, if it has not cached dictionary with id sent on connect"""
+        request_payload_type = None
+        target = TargetsEnum.for_initiator
+        replay = False
+        local = True
+        uses_db = False
+        compress = False
+
+        def initiator_catch(self, message: Message, payload: request_payload_type):
+            codec = self.consumer.compression
+            if not codec:
+                self.consumer.Error(payload=ResponsePayload.ActionNotExist(), consumer=self.consumer).fire()
+                return
+            return self.return_event(payload={
+                'dictionary_id': codec.dictionary_id,
+                'dictionary': base64.b64encode(codec.dictionary).decode('ascii'),
+            })
+
+    class Subscribe(SimpleEvent):
+        """Subscribe connection to topic, wildcards allowed, e.g. match.*.score"""
+        request_payload_type = TopicPayload
+        target = TargetsEnum.for_initiator
+        replay = False
+        local = True
+
+        def initiator_catch(self, message: Message, payload: request_payload_type):
+            if not topic_index.validate(payload.topic):
+                self.consumer.Error(payload=ResponsePayload.TopicWrong(topic=payload.topic), consumer=self.consumer).fire()
+                return
+            if not self.consumer.can_subscribe(payload.topic):
+                self.consumer.Error(
+                    payload=ResponsePayload.TopicForbidden(topic=payload.topic), consumer=self.consumer
+                ).fire()
+                return
+            consumer = self.consumer
+            if payload.topic not in consumer.subscriptions and len(consumer.subscriptions) >= consumer.max_subscriptions:
+                consumer.Error(
+                    payload=ResponsePayload.SubscriptionLimitExceeded(
+                        topic=payload.topic, max_subscriptions=consumer.max_subscriptions
+                    ),
+                    consumer=consumer
+                ).fire()
+                return
+            consumer.subscribe_topic(payload.topic)
+
+    class Unsubscribe(SimpleEvent):
+        """Unsubscribe connection from topic"""
+        request_payload_type = TopicPayload
+        target = TargetsEnum.for_initiator
+        replay = False
+        local = True
+
+        def initiator_catch(self, message: Message, payload: request_payload_type):
+            self.consumer.unsubscribe_topic(payload.topic)
+
+    class Replay(SimpleEvent):
+        """
+        Replay broadcast group events missed while client was disconnected
+
+        Client send last seen event_id and receive messages of all events after it as target of them,
+        if replay buffer not cover the gap client receive error and must reload state by himself
+        """
+        @dataclass
+        class ReplayPayload(Payload):
+            last_event_id: str = None  #: Last event id received by client
+
+        request_payload_type = ReplayPayload
+        target = TargetsEnum.for_initiator
+        replay = False
+        local = True
+
+        def initiator_catch(self, message: Message, payload: request_payload_type):
+            if not self.consumer.replay_events(payload.last_event_id):
+                self.consumer.Error(payload=ResponsePayload.ReplayUnavailable(), consumer=self.consumer).fire()
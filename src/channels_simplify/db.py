@@ -0,0 +1,84 @@
+import threading
+from contextlib import contextmanager
+from inspect import isclass
+
+from django.db import connections
+
+
+class QueryCounter(threading.local):
+    """
+    Database execute wrapper, count queries of thread
+
+    Installed once into connections of dispatch thread, so detection cost two reads of counter per dispatch
+    """
+
+    queries = 0
+    installed = False
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        """Wrap connections of current thread, they are thread local and kept with their wrappers"""
+        for connection in connections.all():
+            if self not in connection.execute_wrappers:
+                connection.execute_wrappers.append(self)
+        self.installed = True
+
+
+class DispatchQueries:
+    """Queries counted by thread counter since dispatch started"""
+
+    def __init__(self, counter: QueryCounter):
+        self.counter = counter
+        self.started = counter.queries
+
+    @property
+    def queries(self) -> int:
+        return self.counter.queries - self.started
+
+
+class DBUsage:
+    """
+    Decide which dispatches need database connection housekeeping
+
+    Events declare it with :attr:`SimpleEvent.uses_db`, if not declared event is dispatched with housekeeping
+    and queries are counted until it passed detect_dispatches times without any query. Queries of detected database
+    free event are still counted, any query marks event as database bound forever, so rare ORM branch move it back
+    to housekeeping
+    """
+
+    detect_dispatches = 10  #: Query free dispatches before event is treated as database free
+
+    def __init__(self):
+        self.free_dispatches = {}  #: Event class -> query free dispatches in row, -1 if database bound
+        self.counter = QueryCounter()
+
+    def needs_db(self, handler) -> bool:
+        uses_db = getattr(handler, 'uses_db', True) if isclass(handler) else True
+        if uses_db is not None:
+            return uses_db
+        return self.free_dispatches.get(handler, 0) < self.detect_dispatches
+
+    @staticmethod
+    def detected(handler) -> bool:
+        """Database usage of event is detected by queries, not declared"""
+        return isclass(handler) and getattr(handler, 'uses_db', True) is None
+
+    def detecting(self, handler) -> bool:
+        return self.detected(handler) and 0 <= self.free_dispatches.get(handler, 0) < self.detect_dispatches
+
+    @contextmanager
+    def detect(self, handler):
+        if not self.counter.installed:
+            self.counter.install()
+        counter = DispatchQueries(self.counter)
+        yield counter
+        if counter.queries:
+            self.free_dispatches[handler] = -1
+        elif self.detecting(handler):
+            self.free_dispatches[handler] = self.free_dispatches.get(handler, 0) + 1
+
+
+db_usage = DBUsage()  #: Database usage of events in process
@@ -0,0 +1,57 @@
+import os
+import time
+
+from .admission import admission
+from .cache import response_cache
+from .lanes import dispatch_lanes
+
+
+def connection_info(consumer, now: float) -> dict:
+    """State of one connection, read from plain attributes without locks"""
+    connected_at = consumer.connected_at or now
+    uptime = max(now - connected_at, 1e-9)
+    inflight = consumer.inflight
+    outbound = consumer.outbound
+    return {
+        'channel': getattr(consumer, 'channel_name', None),
+        'user_id': getattr(consumer.scope.get('user'), 'id', None),
+        'group': consumer.broadcast_group,
+        'topics': sorted(consumer.subscriptions),
+        'uptime': round(now - connected_at, 3),
+        'received': consumer.received_messages,
+        'sent': consumer.sent_messages,
+        'received_per_second': round(consumer.received_messages / uptime, 3),
+        'sent_per_second': round(consumer.sent_messages / uptime, 3),
+        'outbound': outbound.stats() if outbound else None,
+        'inflight': {'type': inflight[0], 'seconds': round(now - inflight[1], 6)} if inflight else None,
+    }
+
+
+def snapshot(consumer_class: str = None, limit: int = 100) -> dict:
+    """
+    State of process: admission counters and live connections per consumer class
+
+    Copy live consumers once and read their attributes, safe to call from any thread under load,
+    at most limit connections per class are listed, counts are always full
+    """
+    now = time.monotonic()
+    live = admission.live()
+    consumers = {}
+    for consumer in live:
+        name = consumer.__class__.__name__
+        if consumer_class and name != consumer_class:
+            continue
+        info = consumers.setdefault(name, {'connections': 0, 'items': []})
+        info['connections'] += 1
+        if len(info['items']) < limit:
+            info['items'].append(connection_info(consumer, now))
+    return {
+        'pid': os.getpid(),
+        'connections': len(live),
+        'pending_dispatches': admission.pending,
+        'dispatch_latency': round(admission.latency, 6),
+        'dispatch_waiting': dispatch_lanes.waiting,
+        'draining': admission.draining,
+        'response_cache': response_cache.stats(),
+        'consumers': consumers,
+    }
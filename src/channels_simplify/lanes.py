@@ -0,0 +1,95 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Sequence
+
+
+class Priority:
+    """Lanes of inbound dispatches and outbound messages, lower is served first"""
+    control = 0  #: Errors, close and drain notices
+    interactive = 1  #: Client requests and direct messages
+    bulk = 2  #: Broadcast chatter
+
+
+WEIGHTS = (8, 4, 1)  #: Items each lane may take per scheduler round
+
+
+class WeightedScheduler:
+    """
+    Weighted round robin over priority lanes
+
+    Each round lane may take up to its weight items, higher lanes go first,
+    so control traffic keep low latency and bulk lane still get its share under load
+    """
+
+    def __init__(self, weights: Sequence[int] = WEIGHTS):
+        self.weights = tuple(weights)
+        self.credits = list(weights)  #: Items lanes may still take in current round
+
+    def next(self, ready: Sequence[bool]) -> [int, None]:
+        """Lane to serve next among lanes with items, None if all are empty"""
+        for _ in range(2):
+            for lane, credit in enumerate(self.credits):
+                if credit > 0 and ready[lane]:
+                    self.credits[lane] -= 1
+                    return lane
+            if not any(ready):
+                return None
+            self.credits = list(self.weights)
+
+
+class DispatchLanes:
+    """
+    Gate of consumer dispatches of process, waiting dispatches are let in by weighted scheduler
+
+    Sync dispatches of all consumers run one by one in same thread anyway,
+    gate only decide which of them go next instead of first come first served
+    """
+
+    def __init__(self, concurrency: int = 1, weights: Sequence[int] = WEIGHTS):
+        self.concurrency = concurrency  #: Dispatches running at once
+        self.running = 0
+        self.waiters = [deque() for _ in weights]  #: Futures of waiting dispatches per lane
+        self.scheduler = WeightedScheduler(weights)
+
+    @property
+    def waiting(self) -> list:
+        return [len(waiters) for waiters in self.waiters]
+
+    async def acquire(self, lane: int):
+        if self.running < self.concurrency and not any(self.waiters):
+            self.running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[lane].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            elif future in self.waiters[lane]:
+                self.waiters[lane].remove(future)
+            raise
+
+    def release(self):
+        """Hand slot over to next waiting dispatch"""
+        while True:
+            lane = self.scheduler.next(self.waiters)
+            if lane is None:
+                self.running -= 1
+                return
+            future = self.waiters[lane].popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+
+    @asynccontextmanager
+    async def slot(self, lane: int):
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+dispatch_lanes = DispatchLanes()  #: Dispatch gate of process
@@ -0,0 +1,54 @@
+import json
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Show live connections of running server process, read from its introspection endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/channels/introspection/',
+                            help='Introspection endpoint of server process')
+        parser.add_argument('--token', default=getattr(settings, 'CHANNELS_SIMPLIFY_INTROSPECTION_TOKEN', None),
+                            help='Bearer token, CHANNELS_SIMPLIFY_INTROSPECTION_TOKEN setting by default')
+        parser.add_argument('--consumer', help='Consumer class name')
+        parser.add_argument('--limit', type=int, default=100, help='Max listed connections per consumer class')
+        parser.add_argument('--json', action='store_true', help='Print raw json')
+        parser.add_argument('--timeout', type=float, default=5)
+
+    def handle(self, *args, **options):
+        query = {'limit': options['limit'], **({'consumer': options['consumer']} if options['consumer'] else {})}
+        request = Request(f'{options["url"]}?{urlencode(query)}')
+        if options['token']:
+            request.add_header('Authorization', f'Bearer {options["token"]}')
+        try:
+            with urlopen(request, timeout=options['timeout']) as response:
+                state = json.load(response)
+        except (URLError, ValueError) as e:
+            raise CommandError(f'Introspection endpoint not available: {e}')
+
+        if options['json']:
+            self.stdout.write(json.dumps(state, indent=4))
+            return
+
+        self.stdout.write(
+            f'pid {state["pid"]}, connections {state["connections"]}, pending dispatches {state["pending_dispatches"]}, '
+            f'dispatch latency {state["dispatch_latency"] * 1e3:.1f} ms, waiting per lane {state["dispatch_waiting"]}'
+            f'{", draining" if state["draining"] else ""}'
+        )
+        for name, info in state['consumers'].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {info["connections"]} connections'))
+            for item in info['items']:
+                outbound = item['outbound']
+                inflight = item['inflight']
+                inflight = f'{inflight["type"]} {inflight["seconds"] * 1e3:.1f} ms' if inflight else '-'
+                self.stdout.write(
+                    f'  user {item["user_id"]} group {item["group"]} topics {",".join(item["topics"]) or "-"} '
+                    f'in {item["received_per_second"]}/s out {item["sent_per_second"]}/s '
+                    f'queue {outbound["depth"] if outbound else "-"} '
+                    f'inflight {inflight}'
+                )
@@ -0,0 +1,137 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable
+
+from .lanes import Priority, WeightedScheduler, WEIGHTS
+
+
+class OutboundPolicy:
+    """What to do when outbound queue of slow client is full"""
+    drop_oldest = 'drop_oldest'  #: Drop oldest pending message
+    disconnect = 'disconnect'  #: Drop all pending messages and close connection
+    conflate = 'conflate'  #: Keep only latest pending message per conflate key, drop oldest if still full
+
+
+class OutboundQueue:
+    """
+    Bounded queue in front of ASGI send of one connection
+
+    Consumer send only put message to queue, writer task send them to client as fast as client read,
+    so slow client can hold at most maxsize messages in memory
+
+    Messages wait in priority lanes and writer take them by weighted scheduler.
+    On overflow message of lower priority than all pending messages is dropped itself,
+    otherwise oldest message of lowest not empty lane is dropped, so higher priority message is never dropped
+    for lower one. Accept and other not send messages go out first and do not count to depth
+    """
+
+    key_field = 'conflate_key'  #: Message field with conflate key, removed before send
+    priority_field = 'priority'  #: Message field with priority lane, removed before send
+    close_code = 1008  #: Close code for slow client disconnected by policy
+
+    def __init__(self, send: Callable[[dict], Awaitable], maxsize: int, policy: str = OutboundPolicy.drop_oldest):
+        self.send = send
+        self.maxsize = maxsize
+        self.policy = policy
+        self.lanes = [OrderedDict() for _ in WEIGHTS]  #: Key -> ASGI send message per priority lane
+        self.control = deque()  #: Accept and other not send messages, never dropped
+        self.scheduler = WeightedScheduler(WEIGHTS)
+        self.closing = None  #: Close message, sent after all pending messages
+        self.sequence = 0
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.sent = 0  #: Messages sent to client
+        self.dropped = 0  #: Messages dropped by overflow
+        self.conflated = 0  #: Messages replaced by newer message with same key
+        self.max_depth = 0  #: Highest depth seen
+
+    @property
+    def depth(self) -> int:
+        return sum(map(len, self.lanes))
+
+    def stats(self) -> dict:
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'lanes': [len(messages) for messages in self.lanes],
+        }
+
+    async def put(self, message: dict):
+        """ASGI send replacement, never wait for client"""
+        if self.closed:
+            return
+        key = message.pop(self.key_field, None)
+        lane = message.pop(self.priority_field, Priority.interactive)
+        if message['type'] == 'websocket.close':
+            self.close(message)
+            return
+        if message['type'] != 'websocket.send':
+            self.control.append(message)
+            self.wakeup.set()
+            return
+        messages = self.lanes[lane]
+        if key is not None and self.policy == OutboundPolicy.conflate and ('key', key) in messages:
+            messages[('key', key)] = message
+            self.conflated += 1
+            return
+        if self.depth >= self.maxsize:
+            if self.policy == OutboundPolicy.disconnect:
+                self.dropped += self.depth
+                for pending in self.lanes:
+                    pending.clear()
+                self.close({'type': 'websocket.close', 'code': self.close_code})
+                return
+            if lane > self.lowest_lane():
+                self.dropped += 1
+                return
+            self.drop_oldest()
+        self.sequence += 1
+        messages[('key', key) if key is not None else self.sequence] = message
+        self.max_depth = max(self.max_depth, self.depth)
+        self.wakeup.set()
+
+    def lowest_lane(self) -> int:
+        """Lowest priority lane with pending messages"""
+        return max((lane for lane, messages in enumerate(self.lanes) if messages), default=-1)
+
+    def drop_oldest(self):
+        for messages in reversed(self.lanes):
+            if messages:
+                messages.popitem(last=False)
+                self.dropped += 1
+                return
+
+    def close(self, message: dict):
+        self.closing = message
+        self.closed = True
+        self.wakeup.set()
+
+    async def write(self):
+        while True:
+            if self.control:
+                await self.send(self.control.popleft())
+                self.sent += 1
+                continue
+            lane = self.scheduler.next(self.lanes)
+            if lane is None:
+                if self.closing:
+                    await self.send(self.closing)
+                    self.sent += 1
+                    return
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            _, message = self.lanes[lane].popitem(last=False)
+            await self.send(message)
+            self.sent += 1
+
+    async def serve(self, consumer: Awaitable):
+        """Run consumer with writer task alongside"""
+        writer = asyncio.ensure_future(self.write())
+        try:
+            return await consumer
+        finally:
+            writer.cancel()
@@ -0,0 +1,89 @@
+import cProfile
+import random
+import threading
+import time
+from typing import Callable, Iterable
+
+
+class EventProfiler:
+    """
+    Profile dispatch of selected events or consumer classes for time window
+
+    Events are selected by name, channel layer message type or event sent by client and handled
+    in receive_json (local and audience events), stats of all profiled dispatches are aggregated and dumped to pstats file when window ends,
+    read them with python -m pstats, dispatch check only active flag while profiler is off
+
+    >>> profiler.enable(events=['test.event.all.and.self'], duration=60, output='/tmp/events.prof')
+    """
+
+    def __init__(self):
+        self.active = False  #: Checked on every dispatch, keep it cheap
+        self.events = None  #: Event names to profile, all if None
+        self.consumers = None  #: Consumer class names to profile, all if None
+        self.sample_rate = 1.0  #: Part of matched dispatches to profile
+        self.until = 0.0
+        self.output = None
+        self.profile = None
+        self.dispatches = 0  #: Profiled dispatches in current window
+        self.running = False  #: Profile is collecting, nested runs are part of outer one
+        self.timer = None  #: Dump stats when window ends, even if no dispatch come after it
+        self.lock = threading.RLock()
+
+    def enable(self, events: Iterable[str] = None, consumers: Iterable[str] = None, duration: float = 60,
+               sample_rate: float = 1.0, output: str = 'channels-simplify.prof'):
+        with self.lock:
+            if self.active:
+                self.disable()
+            self.events = set(events) if events else None
+            self.consumers = set(consumers) if consumers else None
+            self.sample_rate = sample_rate
+            self.until = time.monotonic() + duration
+            self.output = output
+            self.profile = cProfile.Profile()
+            self.dispatches = 0
+            self.active = True
+            self.timer = threading.Timer(duration, self.expire, args=(self.until,))
+            self.timer.daemon = True
+            self.timer.start()
+
+    def expire(self, until: float):
+        with self.lock:
+            if self.active and self.until == until:
+                self.disable()
+
+    def disable(self) -> [str, None]:
+        """Stop profiling and dump aggregated stats, return stats file path"""
+        with self.lock:
+            if not self.active:
+                return None
+            self.active = False
+            if self.timer and self.timer is not threading.current_thread():
+                self.timer.cancel()
+            self.timer = None
+            if self.dispatches:
+                self.profile.dump_stats(self.output)
+            return self.output if self.dispatches else None
+
+    def match(self, consumer, event: str) -> bool:
+        if time.monotonic() > self.until:
+            self.disable()
+            return False
+        if self.events is not None and event not in self.events:
+            return False
+        if self.consumers is not None and consumer.__class__.__name__ not in self.consumers:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def run(self, f: Callable, *args):
+        with self.lock:
+            if not self.active or self.running:
+                return f(*args)
+            self.dispatches += 1
+            self.running = True
+            try:
+                return self.profile.runcall(f, *args)
+            finally:
+                self.running = False
+
+
+profiler = EventProfiler()  #: Profiler of process
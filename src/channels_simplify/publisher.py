@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+from typing import Iterable, Union
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+
+from .replay import record_sent
+from .signatures import EventSystem, Payload, BaseEvent
+from .topics import topic_messages
+from .utils import camel_to_dot, user_group
+
+User = get_user_model()
+
+
+def channels_content(event_cls, payload: dict, system: dict = None, group: str = None, topic: str = None,
+                     user: int = None) -> dict:
+    content = {
+        'type': camel_to_dot(event_cls.__name__),
+        'payload': payload,
+        'system': {**(system or EventSystem().serialize()), 'event_id': str(uuid.uuid4())}
+    }
+    if group:
+        content['group'] = group
+    if topic:
+        content['topic'] = topic
+    if user is not None:
+        content['user'] = user
+    return content
+
+
+def validate_payload(event_cls, payload: [Payload, dict, None]) -> dict:
+    """Check payload against event request payload type, raise TypeError if signature wrong"""
+    payload = BaseEvent.serialize_payload(payload) if payload else {}
+    payload_type = getattr(event_cls, 'request_payload_type', None)
+    if payload_type:
+        payload = payload_type(**payload).serialize()
+    return payload
+
+
+def audience_destinations(recipients) -> tuple:
+    """
+    Channels and user groups of recipients, recipients is users queryset or list of users, user ids and channel names
+    """
+    if isinstance(recipients, QuerySet):
+        recipients = recipients.values_list('id', flat=True)
+    channels, groups = set(), set()
+    for recipient in recipients:
+        if isinstance(recipient, str):
+            channels.add(recipient)
+        else:
+            groups.add(user_group(recipient))
+    return channels, groups
+
+
+async def send_concurrently(sends: list, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(f, *args):
+        async with semaphore:
+            await f(*args)
+
+    await asyncio.gather(*[send(*s) for s in sends])
+
+
+async def apublish(event_cls, payload: [Payload, dict] = None, groups: Iterable[str] = (),
+                   users: Iterable[Union[User, int]] = (), channels: Iterable[str] = (), topics: Iterable[str] = (),
+                   concurrency: int = 100) -> int:
+    """
+    Fire event to broadcast groups, users, channels or topic subscribers without consumer instance
+
+    Topic publish is sent to topic routers of processes with matching subscriptions, see :class:`topics.TopicRouter`
+
+    Users get event through their user groups on every open connection as its initiator,
+    payload is validated and encoded once and layer sends are issued concurrently, return count of sent messages
+
+    >>> await apublish(TestConsumer.TestEventAllAndSelf, {'message': 'Hi'}, groups=['test_consumer'], users=[1, 2])
+    """
+    payload = validate_payload(event_cls, payload)
+    channel_layer = get_channel_layer()
+    sends = []
+    for group in groups:
+        content = channels_content(event_cls, payload, group=group)
+        if getattr(event_cls, 'replay', False):
+            record_sent(group, content)
+        sends.append((channel_layer.group_send, group, content))
+    sends += [(channel_layer.send, channel, channels_content(event_cls, payload)) for channel in channels]
+    sends += [
+        (channel_layer.group_send, user_group(user), channels_content(event_cls, payload, user=getattr(user, 'id', user)))
+        for user in users
+    ]
+    for topic in topics:
+        content = channels_content(event_cls, payload, topic=topic)
+        sends += [(channel_layer.group_send, group, message) for group, message in topic_messages(topic, content)]
+    await send_concurrently(sends, concurrency)
+    return len(sends)
+
+
+async def apublish_bulk(event_cls, user_payloads: dict, concurrency: int = 100) -> int:
+    """
+    Fire event with personal payload for each user, user_payloads is mapping of user or user id to payload
+
+    >>> await apublish_bulk(TestConsumer.TestEventAllAndSelf, {user.id: {'unread': user.unread} for user in users})
+    """
+    payloads = {getattr(user, 'id', user): validate_payload(event_cls, payload) for user, payload in user_payloads.items()}
+    channel_layer = get_channel_layer()
+    sends = [
+        (channel_layer.group_send, user_group(user_id), channels_content(event_cls, payload, user=user_id))
+        for user_id, payload in payloads.items()
+    ]
+    await send_concurrently(sends, concurrency)
+    return len(sends)
+
+
+publish = async_to_sync(apublish)
+publish_bulk = async_to_sync(apublish_bulk)
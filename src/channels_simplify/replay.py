@@ -0,0 +1,76 @@
+import copy
+import threading
+from collections import deque
+from itertools import islice
+
+
+class ReplayBuffer:
+    """
+    Bounded ring buffer of recent broadcast group events for one group
+
+    Channel layer messages of events are recorded when they are sent to group and when they are received,
+    indexed by event id, so a reconnecting client get the gap from memory, even if nobody else received it
+    """
+
+    def __init__(self, size: int):
+        self.size = size  #: Max events kept, oldest are evicted first
+        self.messages = deque(maxlen=size)  #: (sequence, event_id, channel layer message)
+        self.index = {}  #: event_id -> sequence
+        self.sequence = 0  #: Sequence of last recorded event
+        self.lock = threading.Lock()
+
+    def __contains__(self, event_id):
+        return event_id in self.index
+
+    def __len__(self):
+        return len(self.messages)
+
+    def record(self, content: dict) -> bool:
+        """Record channel layer message of event, message with already recorded event id is ignored"""
+        event_id = content.get('system', {}).get('event_id')
+        if not event_id:
+            return False
+        with self.lock:
+            if event_id in self.index:
+                return False
+            if len(self.messages) == self.size:
+                _, evicted_id, _ = self.messages.popleft()
+                self.index.pop(evicted_id, None)
+            self.sequence += 1
+            self.messages.append((self.sequence, event_id, copy.deepcopy(content)))
+            self.index[event_id] = self.sequence
+        return True
+
+    def since(self, event_id: str = None) -> [list, None]:
+        """
+        Channel layer messages of events recorded after event id, all recorded events if event id not provided
+
+        Return None if event id already evicted or never recorded, client must reload state by himself
+        """
+        with self.lock:
+            if not event_id:
+                start = 0
+            elif event_id in self.index:
+                start = self.index[event_id] - self.messages[0][0] + 1
+            else:
+                return None
+            return [copy.deepcopy(content) for _, _, content in islice(self.messages, start, None)]
+
+
+buffers = {}  #: Group name -> ReplayBuffer, shared by all consumers of process
+buffers_lock = threading.Lock()
+
+
+def get_replay_buffer(group_name: str, size: int) -> ReplayBuffer:
+    with buffers_lock:
+        buffer = buffers.get(group_name)
+        if not buffer:
+            buffer = buffers[group_name] = ReplayBuffer(size)
+        return buffer
+
+
+def record_sent(group_name: str, content: dict):
+    """Record message sent to group in buffer of group if consumers of process keep one"""
+    buffer = buffers.get(group_name)
+    if buffer:
+        buffer.record(content)
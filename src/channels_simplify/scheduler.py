@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+
+from .publisher import apublish, validate_payload
+from .signatures import Payload
+
+User = get_user_model()
+
+
+class Timer:
+    """Pending event fire, cancel it with :func:`Timer.cancel`"""
+    __slots__ = ('deadline', 'interval', 'callback', 'key', 'cancelled')
+
+    def __init__(self, deadline: int, callback: Callable, interval: int = None, key=None):
+        self.deadline = deadline  #: Tick when timer must fire
+        self.interval = interval  #: Ticks between fires of periodic timer
+        self.callback = callback  #: Called with no arguments when timer fire
+        self.key = key  #: Timers with same key fired at same tick are coalesced to one callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel
+
+    Level 0 slots are single ticks, each next level slot covers whole previous level,
+    timers are cascaded to lower levels when their slot is reached, so add, cancel and per tick work are O(1)
+    """
+
+    def __init__(self, slot_bits: int = 6, levels: int = 4):
+        self.slot_bits = slot_bits
+        self.slots = 1 << slot_bits
+        self.levels = levels
+        self.wheels = [[[] for _ in range(self.slots)] for _ in range(levels)]
+        self.tick = 0  #: Current tick
+        self.pending = 0  #: Timers in wheel including cancelled but not yet swept
+
+    def add(self, timer: Timer):
+        self.pending += 1
+        timer.deadline = max(timer.deadline, self.tick + 1)
+        self.place(timer)
+
+    def place(self, timer: Timer):
+        deadline = timer.deadline
+        delta = deadline - self.tick
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self.slot_bits * (level + 1)):
+            level += 1
+        slot = (deadline >> (self.slot_bits * level)) & (self.slots - 1)
+        self.wheels[level][slot].append(timer)
+
+    def advance(self) -> list:
+        """Move to next tick and return timers expired on it"""
+        self.tick += 1
+        for level in range(1, self.levels):
+            if self.tick & ((1 << (self.slot_bits * level)) - 1):
+                break
+            slot = (self.tick >> (self.slot_bits * level)) & (self.slots - 1)
+            timers, self.wheels[level][slot] = self.wheels[level][slot], []
+            for timer in timers:
+                if timer.cancelled:
+                    self.pending -= 1
+                else:
+                    self.place(timer)
+        slot = self.tick & (self.slots - 1)
+        timers, self.wheels[0][slot] = self.wheels[0][slot], []
+        self.pending -= len(timers)
+        return [timer for timer in timers if not timer.cancelled]
+
+
+class Scheduler:
+    """
+    Fire events to broadcast group or user at given time or periodically, without consumer instance
+
+    >>> scheduler.schedule(TestConsumer.TestEventAllAndSelf, group='test_consumer', every=30)
+    """
+
+    def __init__(self, resolution: float = 0.1, slot_bits: int = 6, levels: int = 4):
+        self.resolution = resolution  #: Seconds in one tick
+        self.wheel = TimerWheel(slot_bits=slot_bits, levels=levels)
+        self.lock = threading.Lock()
+        self.started_at = None
+        self.task = None  #: Task of run on event loop
+        self.thread = None  #: Background thread of run if started outside of event loop
+
+    def ticks(self, seconds: float) -> int:
+        return max(1, round(seconds / self.resolution))
+
+    def schedule(self, event_cls, payload: [Payload, dict] = None, group: str = None, user: [User, int] = None,
+                 at: float = None, delay: float = None, every: float = None) -> Timer:
+        """
+        Fire event at unix time, after delay seconds or every N seconds
+
+        Periodic timer first fire after one interval if neither at nor delay provided
+        """
+        if not group and not user:
+            raise ValueError('Provide group or user to fire scheduled event')
+        payload = validate_payload(event_cls, payload)
+        if at is not None:
+            delay = at - time.time()
+        if delay is None:
+            delay = every or 0
+        key = (event_cls, group, getattr(user, 'id', user), json.dumps(payload, sort_keys=True, default=str))
+
+        def fire():
+            return apublish(event_cls, payload, groups=[group] if group else [], users=[user] if user else [])
+
+        self.start()
+        with self.lock:
+            timer = Timer(
+                deadline=self.wheel.tick + self.ticks(delay),
+                interval=self.ticks(every) if every else None,
+                callback=fire,
+                key=key
+            )
+            self.wheel.add(timer)
+        return timer
+
+    def expired(self, now: float) -> list:
+        """Advance wheel up to now, return expired timers coalesced by key"""
+        target = int((now - self.started_at) / self.resolution)
+        fired = {}
+        with self.lock:
+            while self.wheel.tick < target:
+                for timer in self.wheel.advance():
+                    fired.setdefault(timer.key, timer)
+                    if timer.interval:
+                        timer.deadline += timer.interval
+                        self.wheel.add(timer)
+        return list(fired.values())
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.resolution)
+            timers = self.expired(time.monotonic())
+            if timers:
+                results = await asyncio.gather(*[timer.callback() for timer in timers], return_exceptions=True)
+                for error in filter(lambda r: isinstance(r, Exception), results):
+                    print(f'Scheduled event failed: {error.__class__.__name__}: {error}')
+
+    @property
+    def running(self) -> bool:
+        if self.task is not None:
+            return not self.task.done() and not self.task.get_loop().is_closed()
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """
+        Start wheel on running event loop, or in background thread if called outside of loop
+
+        Started again if loop of previous run stopped, e.g. asyncio.run finished, timers due meanwhile fire late
+        """
+        with self.lock:
+            if self.running:
+                return
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+            self.task = self.thread = None
+            try:
+                self.task = asyncio.get_running_loop().create_task(self.run())
+            except RuntimeError:
+                self.thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True,
+                                               name='channels-simplify-scheduler')
+                self.thread.start()
+
+
+scheduler = Scheduler()  #: Default process scheduler
@@ -56,11 +56,71 @@ class ResponsePayload:
         error_hash: str  #: Hash of error
         message: str = 'Something wrong'  #: Error message
 
+    @dataclass
+    class ServerOverloaded(Payload):
+        retry_after: int  #: Seconds to wait before reconnect
+        message: str = 'Server overloaded, reconnect later'  #: Error message
+
+    @dataclass
+    class ServerDraining(Payload):
+        message: str = 'Server is restarting, reconnect'  #: Error message
+
+    @dataclass
+    class TopicWrong(Payload):
+        topic: str  #: Topic pattern sent by client
+        message: str = 'Topic pattern wrong'  #: Error message
+
+    @dataclass
+    class TopicForbidden(Payload):
+        topic: str  #: Topic pattern sent by client
+        message: str = 'Subscription to topic not allowed'  #: Error message
+
+    @dataclass
+    class SubscriptionLimitExceeded(Payload):
+        topic: str  #: Topic pattern sent by client
+        max_subscriptions: int  #: Topics client may subscribe at once
+        message: str = 'Too many topic subscriptions'  #: Error message
+
+    @dataclass
+    class StreamWindowExceeded(Payload):
+        stream_id: int  #: Dropped stream
+        message: str = 'Stream sent more than acknowledged window'  #: Error message
+
+    @dataclass
+    class StreamWrong(Payload):
+        stream_id: int  #: Dropped stream
+        message: str = 'Stream id is reserved for server streams'  #: Error message
+
+    @dataclass
+    class StreamLimitExceeded(Payload):
+        stream_id: int  #: Dropped stream
+        max_streams: int  #: Streams client may send at once
+        message: str = 'Too many streams in progress'  #: Error message
+
+    @dataclass
+    class OutputWrong(Payload):
+        output: str  #: Output sent by client
+        message: str = 'Output must be file name, it is written to configured output directory'  #: Error message
+
+    @dataclass
+    class DeliveryFailed(Payload):
+        destinations: int  #: Channels or groups event was not delivered to
+        message: str = 'Event not delivered to some recipients'  #: Error message
+
+    @dataclass
+    class ReplayUnavailable(Payload):
+        message: str = 'Missed events not available for replay, reload state'  #: Error message
+
     @dataclass
     class Error(Payload):
         message: str  #: Error message
 
 
+@dataclass
+class TopicPayload(Payload):
+    topic: str  #: Topic or topic pattern, words separated by dot
+
+
 class EventsEnum:
     """List of existed events"""
     error = 'error'  #: :func:`SimpleConsumer.error`
@@ -158,6 +218,7 @@ class TargetsEnum:
     for_all = 'for_all'  #: For all users in broadcast group
     for_user = 'for_user'  #: For specific user (lookup by specific key)
     for_initiator = 'for_initiator'  #: For initiator user only
+    for_audience = 'for_audience'  #: For recipients resolved once by :func:`SimpleEvent.audience`
 
 
 class LookupUser:
@@ -245,8 +306,14 @@ def for_user(message: Message):
     return False
 
 
+def for_audience(message: Message):
+    # Event delivered only to channels resolved by initiator, so any receiver except initiator is target
+    return message.target == TargetsEnum.for_audience and not message.is_initiator
+
+
 TargetResolver = {
     TargetsEnum.for_initiator: for_initiator,
     TargetsEnum.for_all: for_all,
-    TargetsEnum.for_user: for_user
+    TargetsEnum.for_user: for_user,
+    TargetsEnum.for_audience: for_audience
 }
@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import re
+import threading
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+SEPARATOR = '.'
+ANY_WORD = '*'  #: Match exactly one topic word
+ANY_TAIL = '#'  #: Match rest of topic, zero or more words, allowed only at the end of pattern
+GROUP_PREFIX = 'topics'
+GROUP_WORD = re.compile(r'[A-Za-z0-9_-]{1,64}')  #: Words used in group names as is, others are hashed
+
+
+class TopicNode:
+    __slots__ = ('children', 'channels')
+
+    def __init__(self):
+        self.children = {}  #: Word -> TopicNode
+        self.channels = set()  #: Channels subscribed to pattern ending at this node
+
+
+class TopicIndex:
+    """
+    Trie of topic subscriptions
+
+    Pattern words are trie edges, so publish to topic walk only branches which can match it,
+    instead of checking every subscription
+
+    >>> index.subscribe('match.*.score', channel_name)
+    >>> index.match('match.42.score')
+    """
+
+    def __init__(self):
+        self.root = TopicNode()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def validate(pattern: str) -> bool:
+        words = pattern.split(SEPARATOR) if pattern else []
+        return bool(words) and all(words) and ANY_TAIL not in words[:-1]
+
+    def subscribe(self, pattern: str, channel: str) -> bool:
+        """Add subscription, False if channel already subscribed to pattern"""
+        if not self.validate(pattern):
+            raise ValueError(f'Topic pattern wrong: {pattern}')
+        with self.lock:
+            node = self.root
+            for word in pattern.split(SEPARATOR):
+                node = node.children.setdefault(word, TopicNode())
+            if channel in node.channels:
+                return False
+            node.channels.add(channel)
+            return True
+
+    def unsubscribe(self, pattern: str, channel: str) -> bool:
+        """Remove subscription, False if channel was not subscribed to pattern"""
+        with self.lock:
+            path = [self.root]
+            for word in pattern.split(SEPARATOR):
+                node = path[-1].children.get(word)
+                if not node:
+                    return False
+                path.append(node)
+            if channel not in path[-1].channels:
+                return False
+            path[-1].channels.discard(channel)
+            # Prune branches left without subscriptions
+            for word, parent, node in reversed(list(zip(pattern.split(SEPARATOR), path, path[1:]))):
+                if node.channels or node.children:
+                    break
+                del parent.children[word]
+        return True
+
+    def match(self, topic: str, wildcard: bool = None) -> set:
+        """
+        Channels subscribed to patterns matching topic
+
+        With wildcard True only patterns starting with wildcard are matched, with False only patterns starting with word
+        """
+        words = topic.split(SEPARATOR)
+        channels = set()
+        with self.lock:
+            root = self.root
+            if wildcard is not None:
+                root = TopicNode()
+                root.children = {
+                    word: node for word, node in self.root.children.items()
+                    if (word in (ANY_WORD, ANY_TAIL)) == wildcard
+                }
+            nodes = [root]
+            for word in words:
+                next_nodes = []
+                for node in nodes:
+                    if ANY_TAIL in node.children:
+                        channels |= node.children[ANY_TAIL].channels
+                    for key in (word, ANY_WORD):
+                        if key in node.children:
+                            next_nodes.append(node.children[key])
+                nodes = next_nodes
+                if not nodes:
+                    break
+            for node in nodes:
+                channels |= node.channels
+                if ANY_TAIL in node.children:
+                    channels |= node.children[ANY_TAIL].channels
+        return channels
+
+
+def topic_group(pattern: str) -> str:
+    """Channel layer group of process routers with subscriptions to patterns starting with same word"""
+    word = pattern.split(SEPARATOR, 1)[0]
+    if word in (ANY_WORD, ANY_TAIL):
+        return f'{GROUP_PREFIX}-any'
+    if not GROUP_WORD.fullmatch(word):
+        word = hashlib.md5(word.encode('utf-8')).hexdigest()
+    return f'{GROUP_PREFIX}.{word}'
+
+
+def topic_messages(topic: str, content: dict) -> list:
+    """
+    Group and message pairs to send topic publish to routers of processes with patterns which may match it
+
+    Router joined both groups match each message only against patterns of its group, so no subscriber get it twice
+    """
+    content = {**content, 'topic': topic}
+    return [
+        (topic_group(topic), {**content, 'topic_wildcard': False}),
+        (f'{GROUP_PREFIX}-any', {**content, 'topic_wildcard': True}),
+    ]
+
+
+class TopicRouter:
+    """
+    Deliver topic publishes of any process to subscribers of this process
+
+    Process router channel join group of first word of every subscribed pattern, publish is sent
+    to group of first word of topic and to group of patterns starting with wildcard,
+    router match received topic against trie of process and forward message to subscribed channels
+    """
+
+    refresh = 3600  #: Seconds between group re-joins, channel layer groups expire
+
+    def __init__(self, index: TopicIndex):
+        self.index = index
+        self.groups = Counter()  #: Group -> subscriptions of process routed through it
+        self.channel = None  #: Router channel on channel layer
+        self.task = None  #: Listen task on event loop of consumers
+        self.lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done() and not self.task.get_loop().is_closed()
+
+    def subscribe(self, pattern: str, channel: str) -> bool:
+        """Subscribe channel in process trie, router join group of pattern if it is first such subscription"""
+        if not self.index.subscribe(pattern, channel):
+            return False
+        group = topic_group(pattern)
+        with self.lock:
+            self.groups[group] += 1
+            join = self.groups[group] == 1
+        if join or not self.running:
+            async_to_sync(self.join)(group)
+        return True
+
+    def unsubscribe(self, pattern: str, channel: str):
+        if not self.index.unsubscribe(pattern, channel):
+            return
+        group = topic_group(pattern)
+        with self.lock:
+            self.groups[group] -= 1
+            leave = self.groups[group] <= 0
+            if leave:
+                del self.groups[group]
+        if leave and self.channel:
+            async_to_sync(get_channel_layer().group_discard)(group, self.channel)
+
+    async def join(self, group: str):
+        channel_layer = get_channel_layer()
+        if not self.running:
+            # First subscription or loop of previous router stopped, start again and join all groups
+            self.channel = await channel_layer.new_channel('topics.router')
+            self.task = asyncio.get_running_loop().create_task(self.listen())
+            with self.lock:
+                groups = list(self.groups)
+            await asyncio.gather(*[channel_layer.group_add(g, self.channel) for g in groups])
+            return
+        await channel_layer.group_add(group, self.channel)
+
+    async def listen(self):
+        channel_layer = get_channel_layer()
+        channel = self.channel
+        while True:
+            try:
+                message = await asyncio.wait_for(channel_layer.receive(channel), self.refresh)
+            except asyncio.TimeoutError:
+                with self.lock:
+                    groups = list(self.groups)
+                await asyncio.gather(*[channel_layer.group_add(group, channel) for group in groups])
+                continue
+            wildcard = message.pop('topic_wildcard', None)
+            channels = self.index.match(message.get('topic', ''), wildcard)
+            await asyncio.gather(*[channel_layer.send(c, message) for c in channels], return_exceptions=True)
+
+
+topic_index = TopicIndex()  #: Subscriptions of all consumers of process
+topic_router = TopicRouter(topic_index)  #: Topic publishes receiver of process
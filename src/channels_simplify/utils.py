@@ -1,10 +1,16 @@
+import os
 import re
+import tempfile
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
 
 User = get_user_model()
 
+OUTPUT_NAME = re.compile(r'(?:[\w.-]|\{pid\})+')  #: Diagnostics file name, {pid} placeholder allowed
+
 
 def camel_to_snake(name):
     name = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
@@ -33,9 +39,48 @@ def snake_to_camel(name):
     return components[0] + ''.join(x.title() for x in components[1:])
 
 
-def user_cache_key(user: User):
-    return f'channels-simplify-user-{user.id}'
+def user_cache_key(user: [User, int]):
+    return f'channels-simplify-user-{getattr(user, "id", user)}'
+
+
+def user_group(user: [User, int]):
+    """Layer group joined by every connection of user"""
+    return f'user.{getattr(user, "id", user)}'
 
 
-def get_system_cache(user: User):
+def get_system_cache(user: [User, int]):
     return cache.get(user_cache_key(user), {})
+
+
+def output_path(name: str) -> [str, None]:
+    """
+    Path of diagnostics file in CHANNELS_SIMPLIFY_OUTPUT_DIR setting, system temp directory by default
+
+    Name comes from client, so only plain file name is accepted, None for paths and other names,
+    {pid} in name is replaced with process id
+    """
+    if not name or not OUTPUT_NAME.fullmatch(name) or name in ('.', '..'):
+        return None
+    directory = getattr(settings, 'CHANNELS_SIMPLIFY_OUTPUT_DIR', None) or tempfile.gettempdir()
+    return os.path.join(directory, name.replace('{pid}', str(os.getpid())))
+
+
+class LazyUser(SimpleLazyObject):
+    """User known by id only, loaded from DB on first access to other fields"""
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, user_id: int):
+        super(LazyUser, self).__init__(lambda: User.objects.get(id=user_id))
+        self.__dict__['id'] = self.__dict__['pk'] = user_id
+
+    def __eq__(self, other):
+        if type(other) is LazyUser or isinstance(other, User):
+            return other.pk == self.pk
+        return False
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __bool__(self):
+        return True
@@ -0,0 +1,34 @@
+import hmac
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .introspection import snapshot
+
+
+def authorized(request) -> bool:
+    """Staff user session or bearer token from CHANNELS_SIMPLIFY_INTROSPECTION_TOKEN setting"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    token = getattr(settings, 'CHANNELS_SIMPLIFY_INTROSPECTION_TOKEN', None)
+    header = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(header, f'Bearer {token}')
+
+
+@require_GET
+def introspection(request):
+    """
+    Live connections of process per consumer class, admin only
+
+    Mount it in urls, ``path('channels/introspection/', introspection)``,
+    query parameters: consumer - consumer class name, limit - max listed connections per class
+    """
+    if not authorized(request):
+        return JsonResponse({'message': 'Forbidden'}, status=403)
+    try:
+        limit = int(request.GET.get('limit', 100))
+    except ValueError:
+        return JsonResponse({'message': 'limit must be integer'}, status=400)
+    return JsonResponse(snapshot(consumer_class=request.GET.get('consumer'), limit=limit))
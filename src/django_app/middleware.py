@@ -2,6 +2,8 @@ from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 
+from channels_simplify.utils import LazyUser
+
 User = get_user_model()
 
 
@@ -13,7 +15,9 @@ class AuthMiddlewareFromPath:
         scope['user'] = AnonymousUser()
         try:
             user_id = scope['path'].split('/')[-2]
-            scope['user'] = await sync_to_async(lambda: User.objects.get(id=user_id))()
+            # Only check user exists, user is loaded lazy on first access, idle connection not hold model instance
+            user_id = await sync_to_async(lambda: User.objects.filter(id=user_id).values_list('id', flat=True)[0])()
+            scope['user'] = LazyUser(user_id)
         except Exception:
             ...
         return await self.inner(scope, receive, send)
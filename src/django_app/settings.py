@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -77,6 +78,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Consumers dispatch in one worker thread, keep its connection open between messages
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -122,7 +126,7 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-INSTALLED_APPS += ['channels']
+INSTALLED_APPS += ['channels', 'channels_simplify']
 
 ASGI_APPLICATION = 'django_app.asgi.application'
 
@@ -131,3 +135,6 @@ CHANNEL_LAYERS = {
         "BACKEND": "channels.layers.InMemoryChannelLayer"
     }
 }
+
+# Bearer token of channels introspection endpoint for channels_introspect command, staff session works without it
+CHANNELS_SIMPLIFY_INTROSPECTION_TOKEN = os.environ.get('CHANNELS_SIMPLIFY_INTROSPECTION_TOKEN')
@@ -16,6 +16,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from channels_simplify.views import introspection
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('channels/introspection/', introspection),
 ]
@@ -1,12 +1,21 @@
 from dataclasses import dataclass
 
-from channels_simplify.consumers import SimpleConsumer, SimpleEvent, TargetsEnum, Message, Payload
+from django.contrib.auth import get_user_model
+
+from channels_simplify.consumers import SimpleConsumer, SimpleEvent, TargetsEnum, Message, Payload, ProfileEvents, \
+    CaptureTraffic
+from channels_simplify.binary import Stream
 from channels_simplify.decoratos import check_recipient_not_me
 
+User = get_user_model()
+
 
 class TestConsumer(SimpleConsumer):
     authed = False
     broadcast_group = 'test_consumer'
+    replay_buffer_size = 100
+    ProfileEvents = ProfileEvents
+    CaptureTraffic = CaptureTraffic
 
     class TestEventAllAndSelf(SimpleEvent):
         request_payload_type = None
@@ -89,6 +98,52 @@ class TestConsumer(SimpleConsumer):
 
             TestConsumer.HappyReceiver(consumer=self.consumer).fire(payload={'Wow': 'Specific user like it'})
 
+    class TestEventForStaff(SimpleEvent):
+        request_payload_type = None
+        target = TargetsEnum.for_audience
+
+        def audience(self, message: Message, payload: request_payload_type):
+            """
+            Recipients resolved once by initiator's consumer with one query, not by each receiver
+
+            Event is delivered only to channels of staff users
+            """
+            return User.objects.filter(is_staff=True)
+
+        def initiator_catch(self, message: Message, payload: request_payload_type):
+            return self.return_event(payload={'Sent': 'Staff will receive it'})
+
+        def target_catch(self, message: Message, payload: request_payload_type):
+            return self.return_event(payload={'Hi': 'Only staff see this'})
+
+    class TestUsersCount(SimpleEvent):
+        request_payload_type = None
+        target = TargetsEnum.for_initiator
+        local = True
+        cache_response = 5
+
+        def initiator_catch(self, message: Message, payload: request_payload_type):
+            """
+            Client send test.users.count signal, and receive users count
+
+            Response is counted once per 5 seconds for same payload, concurrent requests wait for one count,
+            drop it earlier with TestConsumer.TestUsersCount.invalidate_cache()
+            """
+            return self.return_event(payload={'users': User.objects.count()})
+
+    class TestBinaryEcho(SimpleEvent):
+        def binary_catch(self, stream: Stream, chunk: memoryview):
+            """
+            Client send binary stream with test.binary.echo name, and receive same bytes back as stream
+
+            Chunks come as memoryview without copy, collect them until last chunk
+            """
+            if not hasattr(self, 'data'):
+                self.data = bytearray()
+            self.data += chunk
+            if stream.finished:
+                self.consumer.send_stream('test.binary.echo', self.data)
+
     class HappyReceiver(SimpleEvent):
         """
         This event is hidden, you can't access for that from client side, it can be fired only from backend
@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+
+from django.conf import settings  # noqa: E402
+
+# Consumer tests connect users, keep their database out of source tree
+settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(prefix='channels-simplify-tests-'), 'db.sqlite3')
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+
+call_command('migrate', run_syncdb=True, verbosity=0)
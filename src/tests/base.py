@@ -0,0 +1,31 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+async def create_user(username: str, **fields):
+    return await sync_to_async(User.objects.create)(username=username, **fields)
+
+
+async def connect(user) -> WebsocketCommunicator:
+    from django_app.asgi import application
+    communicator = WebsocketCommunicator(application, f'/ws/{user.id}/')
+    connected, _ = await communicator.connect()
+    assert connected
+    return communicator
+
+
+async def receive_all(communicator: WebsocketCommunicator, timeout: float = 0.3) -> list:
+    """Messages client got until nothing come for timeout seconds"""
+    messages = []
+    while not await communicator.receive_nothing(timeout):
+        messages.append(await communicator.receive_json_from())
+    return messages
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
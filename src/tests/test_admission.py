@@ -0,0 +1,76 @@
+import unittest
+import uuid
+from unittest import mock
+
+from channels.testing import WebsocketCommunicator
+
+from channels_simplify.admission import Admission, CloseCode, admission
+from test_consumer.consumer import TestConsumer
+from tests.base import create_user, connect, receive_all, run
+
+
+class Limits:
+    max_connections = 1
+    max_pending_dispatches = 2
+    max_dispatch_latency = 0.5
+
+
+class AdmissionTest(unittest.TestCase):
+    def test_reject_code(self):
+        state, consumer = Admission(), Limits()
+        self.assertIsNone(state.reject_code(consumer))
+        state.pending, state.latency = 3, 0.0
+        self.assertEqual(state.reject_code(consumer), CloseCode.try_again_later)
+        state.pending, state.latency = 0, 1.0
+        self.assertEqual(state.reject_code(consumer), CloseCode.try_again_later)
+        state.latency = 0.0
+        state.register(consumer)
+        self.assertEqual(state.reject_code(consumer), CloseCode.try_again_later)
+        state.unregister(consumer)
+        self.assertIsNone(state.reject_code(consumer))
+        state.draining = True
+        self.assertEqual(state.reject_code(consumer), CloseCode.service_restart)
+
+
+async def closed_with(communicator: WebsocketCommunicator) -> tuple:
+    """Error payload and close code connection got"""
+    error = await communicator.receive_json_from(1)
+    close = await communicator.receive_output(1)
+    return error['payload'], close.get('code')
+
+
+class AdmissionConsumerTest(unittest.TestCase):
+    def tearDown(self):
+        admission.draining = False
+
+    def test_connection_past_limit_rejected(self):
+        async def main():
+            user = await create_user(f'admitted-{uuid.uuid4()}')
+            with mock.patch.object(TestConsumer, 'max_connections', admission.counts[TestConsumer] + 1):
+                first = await connect(user)
+                second = await connect(user)
+                rejected = await closed_with(second)
+            await receive_all(first)
+            for communicator in (first, second):
+                await communicator.disconnect()
+            return rejected
+
+        self.assertEqual(run(main()), (
+            {'retry_after': 5, 'message': 'Server overloaded, reconnect later'}, CloseCode.try_again_later
+        ))
+
+    def test_drain_close_live_connections_and_reject_new(self):
+        async def main():
+            user = await create_user(f'drained-{uuid.uuid4()}')
+            communicators = [await connect(user), await connect(user)]
+            for communicator in communicators:
+                await receive_all(communicator)
+            await admission.drain(wave_size=1, interval=0)
+            communicators.append(await connect(user))
+            closed = [await closed_with(communicator) for communicator in communicators]
+            for communicator in communicators:
+                await communicator.disconnect()
+            return closed
+
+        drained = ({'message': 'Server is restarting, reconnect'}, CloseCode.service_restart)
+        self.assertEqual(run(main()), [drained] * 3)
@@ -0,0 +1,100 @@
+import unittest
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+
+from channels_simplify.publisher import apublish, audience_destinations
+from test_consumer.consumer import TestConsumer
+from tests.base import create_user, connect, receive_all, run
+
+
+def payloads(messages: list) -> list:
+    return [message['payload'] for message in messages]
+
+
+class AudienceDestinationsTest(unittest.TestCase):
+    def test_users_resolved_to_user_groups(self):
+        channels, groups = audience_destinations([1, 'specific.channel!abc', 2])
+        self.assertEqual(channels, {'specific.channel!abc'})
+        self.assertEqual(groups, {'user.1', 'user.2'})
+
+
+class AudienceRoutingTest(unittest.TestCase):
+    def test_only_audience_connections_receive(self):
+        async def main():
+            author = await create_user(f'author-{uuid.uuid4()}')
+            staff = await create_user(f'staff-{uuid.uuid4()}', is_staff=True)
+            other = await create_user(f'other-{uuid.uuid4()}')
+            a, s1, s2, o = await connect(author), await connect(staff), await connect(staff), await connect(other)
+            await a.send_json_to({'event': 'test.event.for.staff', 'payload': {}})
+            received = [payloads(await receive_all(c)) for c in (a, s1, s2, o)]
+            for c in (a, s1, s2, o):
+                await c.disconnect()
+            return received
+
+        author, first_tab, second_tab, other = run(main())
+        self.assertEqual(author, [{'Sent': 'Staff will receive it'}])
+        self.assertEqual(first_tab, [{'Hi': 'Only staff see this'}])
+        self.assertEqual(second_tab, [{'Hi': 'Only staff see this'}])
+        self.assertEqual(other, [])
+
+    def test_initiator_in_audience_receive_once(self):
+        async def main():
+            staff = await create_user(f'staff-{uuid.uuid4()}', is_staff=True)
+            first, second = await connect(staff), await connect(staff)
+            await first.send_json_to({'event': 'test.event.for.staff', 'payload': {}})
+            received = [payloads(await receive_all(c)) for c in (first, second)]
+            for c in (first, second):
+                await c.disconnect()
+            return received
+
+        first, second = run(main())
+        self.assertEqual(first, [{'Sent': 'Staff will receive it'}])
+        self.assertEqual(second, [{'Hi': 'Only staff see this'}])
+
+    def test_audience_resolved_once_by_initiator(self):
+        audience = TestConsumer.TestEventForStaff.audience
+        calls = []
+
+        def counted(event, message, payload):
+            calls.append(event.consumer.channel_name)
+            return audience(event, message, payload)
+
+        async def main():
+            author = await create_user(f'author-{uuid.uuid4()}')
+            staff = await create_user(f'staff-{uuid.uuid4()}', is_staff=True)
+            a, s1, s2 = await connect(author), await connect(staff), await connect(staff)
+            with mock.patch.object(TestConsumer.TestEventForStaff, 'audience', counted):
+                await a.send_json_to({'event': 'test.event.for.staff', 'payload': {}})
+                received = [len(await receive_all(c)) for c in (a, s1, s2)]
+            for c in (a, s1, s2):
+                await c.disconnect()
+            return received
+
+        self.assertEqual(run(main()), [1, 1, 1])
+        self.assertEqual(len(calls), 1)
+
+
+class UserDeliveryTest(unittest.TestCase):
+    def test_publish_to_user_reach_every_connection(self):
+        async def main():
+            user = await create_user(f'user-{uuid.uuid4()}')
+            first, second = await connect(user), await connect(user)
+            for c in (first, second):
+                await receive_all(c)
+            # Delivery not depend on cached user system
+            cache.clear()
+            sent = await apublish(TestConsumer.TestEventAllAndSelf, users=[user.id])
+            received = [await receive_all(c) for c in (first, second)]
+            await first.disconnect()
+            await apublish(TestConsumer.TestEventAllAndSelf, users=[user])
+            received.append(await receive_all(second))
+            await second.disconnect()
+            return sent, received
+
+        sent, (first, second, after_disconnect) = run(main())
+        self.assertEqual(sent, 1)
+        for messages in (first, second, after_disconnect):
+            self.assertEqual([message['event'] for message in messages], ['test.event.all.and.self'])
+            self.assertEqual(payloads(messages), [{}])
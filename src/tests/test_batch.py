@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from channels.exceptions import ChannelFull
+
+from channels_simplify.batch import LayerBatch
+
+
+class FakeLayer:
+    def __init__(self, full: set = frozenset()):
+        self.full = full  #: Destinations which raise ChannelFull
+        self.written = []
+
+    async def send(self, destination, message):
+        await asyncio.sleep(0)
+        if destination in self.full:
+            raise ChannelFull(destination)
+        self.written.append((destination, message))
+
+    group_send = send
+
+
+class LayerBatchTest(unittest.TestCase):
+    def test_same_destination_keep_order(self):
+        layer = FakeLayer()
+        batch = LayerBatch(layer)
+        for n in range(3):
+            batch.add('send', 'a', n)
+            batch.add('group_send', 'b', n)
+        self.assertEqual(len(batch), 6)
+        self.assertEqual(asyncio.run(batch.flush()), {})
+        self.assertEqual([m for d, m in layer.written if d == 'a'], [0, 1, 2])
+        self.assertEqual([m for d, m in layer.written if d == 'b'], [0, 1, 2])
+        self.assertEqual(batch.writes, {})
+
+    def test_failed_destination_not_stop_others(self):
+        layer = FakeLayer(full={'dead'})
+        batch = LayerBatch(layer)
+        for destination in ('a', 'dead', 'b'):
+            batch.add('send', destination, 1)
+            batch.add('send', destination, 2)
+        errors = asyncio.run(batch.flush())
+        self.assertEqual(list(errors), ['dead'])
+        self.assertIsInstance(errors['dead'], ChannelFull)
+        self.assertEqual(sorted(layer.written), [('a', 1), ('a', 2), ('b', 1), ('b', 2)])
@@ -0,0 +1,87 @@
+import json
+import unittest
+import uuid
+
+from channels_simplify.binary import BinaryFrame, Stream, Flags, HEADER, SERVER_STREAM
+from tests.base import create_user, connect, receive_all, run
+
+
+class BinaryFrameTest(unittest.TestCase):
+    def test_round_trip(self):
+        data = BinaryFrame.pack('test.binary.echo', 7, b'body', Flags.fin)
+        frame = BinaryFrame.parse(data)
+        self.assertEqual((frame.name, frame.stream_id, frame.flags), ('test.binary.echo', 7, Flags.fin))
+        self.assertIsInstance(frame.body, memoryview)
+        self.assertEqual(bytes(frame.body), b'body')
+
+    def test_short_and_unknown_version_rejected(self):
+        with self.assertRaises(ValueError):
+            BinaryFrame.parse(b'\x01\x00')
+        with self.assertRaises(ValueError):
+            BinaryFrame.parse(HEADER.pack(2, 0, 0, 1) + b'body')
+
+
+class StreamTest(unittest.TestCase):
+    def test_consume_and_acknowledge_half_window(self):
+        stream = Stream(1, 'test.binary.echo', 10)
+        self.assertTrue(stream.consume(4))
+        self.assertEqual(stream.acknowledge(), 0)
+        self.assertTrue(stream.consume(4))
+        self.assertEqual(stream.acknowledge(), 8)
+        self.assertEqual((stream.credit, stream.received), (10, 8))
+        self.assertFalse(stream.consume(11))
+
+    def test_chunks_limited_by_credit(self):
+        stream = Stream(SERVER_STREAM | 1, 'test.binary.echo', 5)
+        stream.pending = memoryview(b'abcdefgh')
+        self.assertEqual([(bytes(chunk), last) for chunk, last in stream.chunks(2)], [
+            (b'ab', False), (b'cd', False), (b'e', False)
+        ])
+        stream.credit += 5
+        self.assertEqual([(bytes(chunk), last) for chunk, last in stream.chunks(2)], [(b'fg', False), (b'h', True)])
+        self.assertIsNone(stream.pending)
+
+
+class BinaryStreamConsumerTest(unittest.TestCase):
+    def exchange(self, frames: list) -> tuple:
+        """Send binary frames, return json and binary frames client got"""
+        async def main():
+            user = await create_user(f'streamer-{uuid.uuid4()}')
+            communicator = await connect(user)
+            await receive_all(communicator)
+            for frame in frames:
+                await communicator.send_to(bytes_data=frame)
+            received = []
+            while not await communicator.receive_nothing(0.3):
+                received.append(await communicator.receive_output())
+            await communicator.disconnect()
+            return received
+
+        messages = run(main())
+        texts = [message['text'] for message in messages if message.get('text')]
+        frames = [BinaryFrame.parse(message['bytes']) for message in messages if message.get('bytes')]
+        return texts, frames
+
+    def test_echo_stream(self):
+        texts, frames = self.exchange([
+            BinaryFrame.pack('test.binary.echo', 1, b'hello '),
+            BinaryFrame.pack('test.binary.echo', 1, b'world', Flags.fin),
+        ])
+        self.assertEqual(texts, [])
+        self.assertEqual(b''.join(bytes(frame.body) for frame in frames), b'hello world')
+        self.assertTrue(frames[-1].flags & Flags.fin)
+
+    def test_window_overrun_drop_stream(self):
+        window = 256 * 1024
+        texts, frames = self.exchange([
+            BinaryFrame.pack('test.binary.echo', 1, bytes(window // 2 - 1)),
+            BinaryFrame.pack('test.binary.echo', 1, bytes(window // 2 + 2)),
+            BinaryFrame.pack('test.binary.echo', 1, b'again', Flags.fin),
+        ])
+        self.assertEqual([json.loads(text)['payload'] for text in texts], [
+            {'stream_id': 1, 'message': 'Stream sent more than acknowledged window'}
+        ])
+        # First chunk is below half of window, not acknowledged, second one is above left credit
+        self.assertFalse([frame for frame in frames if frame.flags & Flags.ack])
+        # Data of dropped stream is gone, same id start new stream
+        self.assertEqual(b''.join(bytes(frame.body) for frame in frames), b'again')
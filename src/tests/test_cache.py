@@ -0,0 +1,38 @@
+import unittest
+
+from channels_simplify.cache import ResponseCache, response_cache
+from channels_simplify.consumers import SimpleConsumer, SimpleEvent
+
+
+class FirstConsumer(SimpleConsumer):
+    class Count(SimpleEvent):
+        cache_response = 5
+
+
+class SecondConsumer(SimpleConsumer):
+    class Count(SimpleEvent):
+        cache_response = 5
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def tearDown(self):
+        response_cache.invalidate()
+
+    def test_same_named_events_cached_apart(self):
+        first, second = FirstConsumer.Count, SecondConsumer.Count
+        self.assertNotEqual(first.cache_name(), second.cache_name())
+        response_cache.put(ResponseCache.key(first.cache_name(), {}), {'count': 1}, 5)
+        response_cache.put(ResponseCache.key(second.cache_name(), {}), {'count': 2}, 5)
+        self.assertEqual(response_cache.get(ResponseCache.key(first.cache_name(), {})), {'count': 1})
+
+        first.invalidate_cache()
+        self.assertIsNone(response_cache.get(ResponseCache.key(first.cache_name(), {})))
+        self.assertEqual(response_cache.get(ResponseCache.key(second.cache_name(), {})), {'count': 2})
+
+    def test_compute_once_per_key(self):
+        cache = ResponseCache()
+        calls = []
+        for _ in range(3):
+            cache.get_or_compute(('event', None, '{}'), 5, lambda: calls.append(1) or len(calls))
+        self.assertEqual(calls, [1])
+        self.assertEqual(cache.stats(), {'size': 1, 'hits': 2, 'misses': 1, 'coalesced': 0})
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from channels_simplify.capture import RecordKind, TrafficRecorder, read_capture
+
+
+def consumer(user_id: int):
+    return SimpleNamespace(scope={'user': SimpleNamespace(id=user_id), 'path': '/ws/'})
+
+
+class TrafficRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'traffic.cap')
+        self.recorder = TrafficRecorder()
+
+    def tearDown(self):
+        self.recorder.disable()
+        self.directory.cleanup()
+
+    def test_append_continue_connection_ids_and_timestamps(self):
+        self.recorder.enable(output=self.output)
+        first = self.recorder.connected(consumer(2 ** 40))
+        self.recorder.frame(*first, text_data='{}')
+        self.recorder.disable()
+
+        self.recorder.enable(output=self.output)
+        second = self.recorder.connected(consumer(1))
+        self.recorder.frame(*second, text_data='{}')
+        self.recorder.disable()
+
+        records = list(read_capture(self.output))
+        self.assertEqual([(r.kind, r.connection, r.user) for r in records], [
+            (RecordKind.connect, 1, 2 ** 40), (RecordKind.text, 1, 2 ** 40),
+            (RecordKind.connect, 2, 1), (RecordKind.text, 2, 1),
+        ])
+        timestamps = [record.timestamp for record in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_incomplete_last_record_cut_on_append(self):
+        self.recorder.enable(output=self.output)
+        self.recorder.connected(consumer(1))
+        self.recorder.disable()
+        with open(self.output, 'ab') as file:
+            file.write(b'\x02\x00')
+
+        self.recorder.enable(output=self.output)
+        self.recorder.connected(consumer(2))
+        self.recorder.disable()
+        self.assertEqual([record.user for record in read_capture(self.output)], [1, 2])
+
+    def test_nothing_written_after_window(self):
+        self.recorder.enable(output=self.output, duration=0.05)
+        connection = self.recorder.connected(consumer(1))
+        time.sleep(0.1)
+        self.recorder.frame(*connection, text_data='{}')
+        self.assertFalse(self.recorder.active)
+        self.assertEqual([record.kind for record in read_capture(self.output)], [RecordKind.connect])
@@ -0,0 +1,23 @@
+import json
+import unittest
+
+from channels_simplify.binary import BinaryFrame, Flags
+from channels_simplify.compression import Codec, ZlibCodec, train_dictionary
+
+
+class CodecTest(unittest.TestCase):
+    def test_codec_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Codec()
+
+    def test_zlib_frame_round_trip_and_memo(self):
+        samples = [json.dumps({'event': 'score', 'payload': {'rows': list(range(n, n + 50))}}).encode() for n in range(5)]
+        codec = ZlibCodec(train_dictionary(samples))
+        text = json.dumps({'event': 'score', 'payload': {'rows': list(range(100))}})
+        frame = codec.frame('score', text)
+        self.assertIs(codec.frame('score', text), frame)
+        parsed = BinaryFrame.parse(frame)
+        self.assertEqual(parsed.name, 'score')
+        self.assertTrue(parsed.flags & Flags.compressed)
+        self.assertEqual(codec.decompress(bytes(parsed.body)).decode('utf-8'), text)
+        self.assertEqual((codec.compressed, codec.reused), (1, 1))
@@ -0,0 +1,31 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+
+from channels_simplify.db import DBUsage
+
+
+class Undeclared:
+    uses_db = None
+
+
+class Declared:
+    uses_db = False
+
+
+class DBUsageTest(unittest.TestCase):
+    def test_query_free_event_detected_and_query_move_it_back(self):
+        usage = DBUsage()
+        self.assertFalse(usage.needs_db(Declared))
+        for _ in range(usage.detect_dispatches):
+            self.assertTrue(usage.needs_db(Undeclared))
+            with usage.detect(Undeclared) as counter:
+                pass
+            self.assertEqual(counter.queries, 0)
+        self.assertFalse(usage.needs_db(Undeclared))
+
+        with usage.detect(Undeclared) as counter:
+            get_user_model().objects.count()
+        self.assertEqual(counter.queries, 1)
+        self.assertTrue(usage.needs_db(Undeclared))
+        self.assertFalse(usage.detecting(Undeclared))
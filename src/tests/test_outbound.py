@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+from channels_simplify.consumers import SimpleConsumer, SimpleEvent
+from channels_simplify.lanes import Priority
+from channels_simplify.outbound import OutboundQueue, OutboundPolicy
+
+
+def send_message(text: str, lane: int = Priority.interactive, key: str = None) -> dict:
+    message = {'type': 'websocket.send', 'text': text, OutboundQueue.priority_field: lane}
+    if key is not None:
+        message[OutboundQueue.key_field] = key
+    return message
+
+
+class ConflateConsumer(SimpleConsumer):
+    outbound_policy = OutboundPolicy.conflate
+
+    class Price(SimpleEvent):
+        hidden = True
+        conflate = 'symbol'
+
+    class Ticker(SimpleEvent):
+        conflate = True
+
+
+class OutboundQueueTest(unittest.TestCase):
+    def run_queue(self, messages: list, maxsize: int, policy: str = OutboundPolicy.drop_oldest) -> tuple:
+        """Put messages while client read nothing, then let writer drain queue, return sent messages and queue"""
+        sent = []
+
+        async def send(message):
+            sent.append(message.get('text', message['type']))
+
+        async def main():
+            queue = OutboundQueue(send, maxsize, policy)
+            for message in messages:
+                await queue.put(message)
+            await queue.put({'type': 'websocket.close'})
+            await asyncio.wait_for(queue.write(), 1)
+            return queue
+
+        return sent, asyncio.run(main())
+
+    def test_accept_not_counted_to_depth(self):
+        async def main():
+            queue = OutboundQueue(None, 2)
+            await queue.put({'type': 'websocket.accept'})
+            await queue.put(send_message('a'))
+            return queue
+
+        queue = asyncio.run(main())
+        self.assertEqual(queue.depth, 1)
+        self.assertEqual(queue.stats()['lanes'], [0, 1, 0])
+
+    def test_lower_priority_message_dropped_itself(self):
+        messages = [{'type': 'websocket.accept'}]
+        messages += [send_message(f'i{n}', key=f'k{n}') for n in range(10)]
+        messages += [send_message('ctrl', Priority.control), send_message('bulk', Priority.bulk)]
+        sent, queue = self.run_queue(messages, 3, OutboundPolicy.conflate)
+        # Control evict oldest interactive, bulk never evict interactive or control
+        self.assertEqual(sent, ['websocket.accept', 'ctrl', 'i8', 'i9', 'websocket.close'])
+        self.assertEqual(queue.dropped, 9)
+
+    def test_same_lane_drop_oldest(self):
+        sent, queue = self.run_queue([send_message(str(n)) for n in range(5)], 3)
+        self.assertEqual(sent, ['2', '3', '4', 'websocket.close'])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_higher_priority_evict_lowest_lane(self):
+        messages = [send_message('b1', Priority.bulk), send_message('i1'), send_message('b2', Priority.bulk),
+                    send_message('i2'), send_message('c1', Priority.control)]
+        sent, queue = self.run_queue(messages, 3)
+        self.assertEqual(sent, ['c1', 'i1', 'i2', 'websocket.close'])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_conflate_replace_pending_message(self):
+        messages = [send_message(f'{key}{n}', key=key) for n in range(3) for key in 'ab']
+        sent, queue = self.run_queue(messages, 2, OutboundPolicy.conflate)
+        self.assertEqual(sent, ['a2', 'b2', 'websocket.close'])
+        self.assertEqual((queue.conflated, queue.dropped), (4, 0))
+
+    def test_disconnect_policy_close_connection(self):
+        sent, queue = self.run_queue([send_message(str(n)) for n in range(3)], 2, OutboundPolicy.disconnect)
+        self.assertEqual(sent, ['websocket.close'])
+        self.assertEqual(queue.dropped, 2)
+
+    def test_conflate_key_of_hidden_and_visible_events(self):
+        consumer = ConflateConsumer()
+        self.assertEqual(consumer.conflate_key({'event': 'price', 'payload': {'symbol': 'BTC'}}), 'price:BTC')
+        self.assertEqual(consumer.conflate_key({'event': 'ticker', 'payload': {}}), 'ticker')
+        self.assertIsNone(consumer.conflate_key({'event': 'error', 'payload': {}}))
+        self.assertIsNone(consumer.conflate_key({'payload': {}}))
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+import uuid
+
+from channels_simplify.profiling import profiler
+from tests.base import create_user, connect, receive_all, run
+
+
+class EventProfilerTest(unittest.TestCase):
+    def tearDown(self):
+        profiler.disable()
+
+    def profile(self, events: list, sent: list) -> tuple:
+        """Profile events while client send sent events, return profiled dispatches and stats file"""
+        output = os.path.join(tempfile.mkdtemp(), 'events.prof')
+
+        async def main():
+            user = await create_user(f'profiled-{uuid.uuid4()}')
+            communicator = await connect(user)
+            profiler.enable(events=events, output=output)
+            for event in sent:
+                await communicator.send_json_to({'event': event, 'payload': {}})
+            await receive_all(communicator)
+            await communicator.disconnect()
+
+        run(main())
+        dispatches = profiler.dispatches
+        return dispatches, profiler.disable()
+
+    def test_local_and_audience_events_selected_by_name(self):
+        sent = ['test.users.count', 'test.event.for.staff', 'test.event.self.only']
+        dispatches, output = self.profile(['test.users.count', 'test.event.for.staff'], sent)
+        # Local event, audience resolve and audience event caught back by initiator
+        self.assertEqual(dispatches, 3)
+        self.assertTrue(os.path.exists(output))
+
+    def test_group_event_selected_by_name(self):
+        dispatches, _ = self.profile(['test.event.all.and.self'], ['test.event.all.and.self', 'test.users.count'])
+        self.assertEqual(dispatches, 1)
+
+    def test_all_events_not_profiled_twice(self):
+        dispatches, _ = self.profile(None, ['test.users.count'])
+        # Receive with nested local event and disconnect
+        self.assertEqual(dispatches, 2)
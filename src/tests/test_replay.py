@@ -0,0 +1,77 @@
+import unittest
+import uuid
+
+from channels_simplify.replay import ReplayBuffer
+from tests.base import create_user, connect, receive_all, run
+
+
+def message(event_id: str = None) -> dict:
+    return {'type': 'test.event', 'payload': {}, 'system': {'event_id': event_id or str(uuid.uuid4())}}
+
+
+class ReplayBufferTest(unittest.TestCase):
+    def test_since_return_messages_after_event(self):
+        buffer = ReplayBuffer(10)
+        messages = [message(str(n)) for n in range(4)]
+        for content in messages:
+            self.assertTrue(buffer.record(content))
+        self.assertEqual(buffer.since('1'), messages[2:])
+        self.assertEqual(buffer.since('3'), [])
+        self.assertEqual(buffer.since(), messages)
+
+    def test_duplicate_and_missing_event_id_ignored(self):
+        buffer = ReplayBuffer(10)
+        self.assertTrue(buffer.record(message('1')))
+        self.assertFalse(buffer.record(message('1')))
+        self.assertFalse(buffer.record({'type': 'test.event', 'system': {}}))
+        self.assertEqual(len(buffer), 1)
+
+    def test_evicted_event_not_available(self):
+        buffer = ReplayBuffer(3)
+        for n in range(5):
+            buffer.record(message(str(n)))
+        self.assertIsNone(buffer.since('0'))
+        self.assertIsNone(buffer.since('unknown'))
+        self.assertEqual([content['system']['event_id'] for content in buffer.since('2')], ['3', '4'])
+
+    def test_recorded_message_not_changed_by_handlers(self):
+        buffer = ReplayBuffer(3)
+        content = message('1')
+        buffer.record(content)
+        content['payload']['changed'] = True
+        replayed = buffer.since()[0]
+        replayed['payload']['again'] = True
+        self.assertEqual(buffer.since()[0]['payload'], {})
+
+
+class ReconnectReplayTest(unittest.TestCase):
+    def test_replay_when_nobody_else_received_event(self):
+        async def main():
+            alice, bob = await create_user(f'alice-{uuid.uuid4()}'), await create_user(f'bob-{uuid.uuid4()}')
+            a, b = await connect(alice), await connect(bob)
+            await a.send_json_to({'event': 'test.event.all.and.self', 'payload': {}})
+            last_event_id = (await b.receive_json_from(2))['event_id']
+            await receive_all(a)
+            await b.disconnect()
+
+            await a.send_json_to({'event': 'test.event.all.and.self', 'payload': {}})
+            await a.send_json_to({'event': 'test.event.for.specific.user', 'payload': {'to_username': bob.username}})
+            await receive_all(a)
+
+            b = await connect(bob)
+            await b.send_json_to({'event': 'replay', 'payload': {'last_event_id': last_event_id}})
+            events = [content['event'] for content in await receive_all(b)]
+            self.assertEqual(events, ['test.event.all.and.self', 'happy.receiver'])
+            for communicator in (a, b):
+                await communicator.disconnect()
+
+        run(main())
+
+    def test_unknown_event_id_report_unavailable(self):
+        async def main():
+            c = await connect(await create_user(f'carol-{uuid.uuid4()}'))
+            await c.send_json_to({'event': 'replay', 'payload': {'last_event_id': 'unknown'}})
+            self.assertEqual((await c.receive_json_from(2))['event'], 'error')
+            await c.disconnect()
+
+        run(main())
@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+
+from channels_simplify.scheduler import Scheduler, Timer, TimerWheel
+
+
+def fire_ticks(wheel: TimerWheel, until: int) -> dict:
+    """Advance wheel up to tick, return timer -> tick when it fired"""
+    fired = {}
+    while wheel.tick < until:
+        for timer in wheel.advance():
+            fired[timer] = wheel.tick
+    return fired
+
+
+class TimerWheelTest(unittest.TestCase):
+    def test_timers_cascade_through_levels(self):
+        # 4 slots per level, 3 levels: level 0 cover 4 ticks, level 1 - 16, level 2 - 64, later deadlines wrap
+        wheel = TimerWheel(slot_bits=2, levels=3)
+        timers = [Timer(deadline=deadline, callback=None) for deadline in range(1, 300)]
+        for timer in timers:
+            wheel.add(timer)
+        fired = fire_ticks(wheel, 300)
+        self.assertEqual({timer.deadline: tick for timer, tick in fired.items()}, {d: d for d in range(1, 300)})
+        self.assertEqual(wheel.pending, 0)
+
+    def test_timers_added_after_start_fire_on_deadline(self):
+        wheel = TimerWheel(slot_bits=2, levels=3)
+        fire_ticks(wheel, 37)
+        timers = [Timer(deadline=37 + delay, callback=None) for delay in (1, 3, 4, 15, 16, 17, 63, 64, 100)]
+        for timer in timers:
+            wheel.add(timer)
+        fired = fire_ticks(wheel, 200)
+        self.assertEqual([fired[timer] for timer in timers], [timer.deadline for timer in timers])
+
+    def test_past_deadline_fire_on_next_tick(self):
+        wheel = TimerWheel(slot_bits=2, levels=3)
+        fire_ticks(wheel, 10)
+        timer = Timer(deadline=3, callback=None)
+        wheel.add(timer)
+        self.assertEqual(fire_ticks(wheel, 20), {timer: 11})
+
+    def test_cancelled_timer_not_fired(self):
+        wheel = TimerWheel(slot_bits=2, levels=3)
+        near, far = Timer(deadline=2, callback=None), Timer(deadline=40, callback=None)
+        wheel.add(near)
+        wheel.add(far)
+        near.cancel()
+        far.cancel()
+        self.assertEqual(fire_ticks(wheel, 64), {})
+        self.assertEqual(wheel.pending, 0)
+
+
+class SchedulerTest(unittest.TestCase):
+    def scheduler(self) -> Scheduler:
+        scheduler = Scheduler(resolution=1, slot_bits=2, levels=3)
+        scheduler.started_at = 0.0
+        return scheduler
+
+    def test_periodic_timer_is_added_again(self):
+        scheduler = self.scheduler()
+        timer = Timer(deadline=3, interval=3, callback=None, key='periodic')
+        scheduler.wheel.add(timer)
+        self.assertEqual(scheduler.expired(2), [])
+        self.assertEqual(scheduler.expired(3), [timer])
+        self.assertEqual(timer.deadline, 6)
+        self.assertEqual(scheduler.expired(5), [])
+        self.assertEqual(scheduler.expired(6), [timer])
+        # Late wheel fire periodic timer once and keep its period
+        self.assertEqual(scheduler.expired(100), [timer])
+        self.assertEqual(timer.deadline, 102)
+        timer.cancel()
+        self.assertEqual(scheduler.expired(110), [])
+
+    def test_timers_with_same_key_coalesced(self):
+        scheduler = self.scheduler()
+        first, second = Timer(deadline=5, callback=None, key='k'), Timer(deadline=5, callback=None, key='k')
+        other = Timer(deadline=5, callback=None, key='other')
+        for timer in (first, second, other):
+            scheduler.wheel.add(timer)
+        self.assertEqual(scheduler.expired(5), [first, other])
+
+    def test_restart_after_loop_stopped(self):
+        scheduler = Scheduler()
+
+        async def start():
+            scheduler.start()
+            return scheduler.running
+
+        self.assertTrue(asyncio.run(start()))
+        self.assertFalse(scheduler.running)
+        self.assertTrue(asyncio.run(start()))
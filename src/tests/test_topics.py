@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+import uuid
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+
+from channels_simplify.topics import TopicIndex, TopicRouter, topic_group, topic_messages
+from test_consumer.consumer import TestConsumer
+from tests.base import create_user, connect, receive_all, run
+
+
+class TopicIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TopicIndex()
+        for pattern, channel in [('match.*.score', 'a'), ('match.#', 'b'), ('match.1.score', 'c'), ('#', 'd')]:
+            self.index.subscribe(pattern, channel)
+
+    def test_match_wildcards(self):
+        self.assertEqual(self.index.match('match.1.score'), {'a', 'b', 'c', 'd'})
+        self.assertEqual(self.index.match('match.2.score'), {'a', 'b', 'd'})
+        self.assertEqual(self.index.match('match'), {'b', 'd'})
+        self.assertEqual(self.index.match('match.1.score.x'), {'b', 'd'})
+        self.assertEqual(self.index.match('other'), {'d'})
+        self.assertEqual(self.index.match('match.1.score', wildcard=False), {'a', 'b', 'c'})
+        self.assertEqual(self.index.match('match.1.score', wildcard=True), {'d'})
+
+    def test_validate(self):
+        for pattern in ('a', 'a.*.b', 'a.#', '#', '*'):
+            self.assertTrue(self.index.validate(pattern), pattern)
+        for pattern in ('', 'a..b', 'a.#.b', '#.a'):
+            self.assertFalse(self.index.validate(pattern), pattern)
+
+    def test_unsubscribe_prune_nodes(self):
+        self.assertFalse(self.index.subscribe('match.#', 'b'))
+        for pattern, channel in [('match.*.score', 'a'), ('match.#', 'b'), ('match.1.score', 'c'), ('#', 'd')]:
+            self.assertTrue(self.index.unsubscribe(pattern, channel))
+        self.assertFalse(self.index.unsubscribe('match.#', 'b'))
+        self.assertEqual(self.index.root.children, {})
+        self.assertEqual(self.index.match('match.1.score'), set())
+
+
+class TopicGroupTest(unittest.TestCase):
+    def test_groups_by_first_word(self):
+        self.assertEqual(topic_group('match.*.score'), 'topics.match')
+        self.assertEqual(topic_group('*.score'), 'topics-any')
+        self.assertEqual(topic_group('#'), 'topics-any')
+        self.assertEqual([group for group, _ in topic_messages('match.1.score', {})], ['topics.match', 'topics-any'])
+
+    def test_invalid_group_words_hashed(self):
+        for word in ('матч', 'x' * 100, 'a:b'):
+            group = topic_group(f'{word}.score')
+            self.assertRegex(group, r'^topics\.[0-9a-f]{32}$')
+
+
+class TopicRouterTest(unittest.TestCase):
+    def test_publish_from_other_process_reach_subscribers(self):
+        async def main():
+            channel_layer = get_channel_layer()
+            router = TopicRouter(TopicIndex())
+            await sync_to_async(router.subscribe)('route.*.score', 'subscriber-a')
+            await sync_to_async(router.subscribe)('#', 'subscriber-b')
+            # Publisher of other process know nothing of subscriptions, only send to groups of topic
+            for group, message in topic_messages('route.1.score', {'type': 'event'}):
+                await channel_layer.group_send(group, message)
+            a = await asyncio.wait_for(channel_layer.receive('subscriber-a'), 1)
+            b = await asyncio.wait_for(channel_layer.receive('subscriber-b'), 1)
+            self.assertEqual(a, {'type': 'event', 'topic': 'route.1.score'})
+            self.assertEqual(b, {'type': 'event', 'topic': 'route.1.score'})
+            # Router is in both groups, still each subscriber get publish once
+            for channel in ('subscriber-a', 'subscriber-b'):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(channel_layer.receive(channel), 0.2)
+
+            await sync_to_async(router.unsubscribe)('route.*.score', 'subscriber-a')
+            self.assertNotIn('topics.route', router.groups)
+            for group, message in topic_messages('route.2.score', {'type': 'event'}):
+                await channel_layer.group_send(group, message)
+            self.assertEqual((await asyncio.wait_for(channel_layer.receive('subscriber-b'), 1))['topic'], 'route.2.score')
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(channel_layer.receive('subscriber-a'), 0.2)
+            router.task.cancel()
+
+        asyncio.run(main())
+
+    def test_subscription_counted_once_per_channel(self):
+        async def main():
+            router = TopicRouter(TopicIndex())
+            self.assertTrue(await sync_to_async(router.subscribe)('count.#', 'subscriber'))
+            self.assertFalse(await sync_to_async(router.subscribe)('count.#', 'subscriber'))
+            self.assertEqual(router.groups['topics.count'], 1)
+            await sync_to_async(router.unsubscribe)('count.#', 'subscriber')
+            await sync_to_async(router.unsubscribe)('count.#', 'subscriber')
+            self.assertEqual(dict(router.groups), {})
+            router.task.cancel()
+
+        asyncio.run(main())
+
+
+class SubscriptionLimitTest(unittest.TestCase):
+    @mock.patch.object(TestConsumer, 'max_subscriptions', 2)
+    def test_subscribe_past_limit_answered_with_error(self):
+        async def main():
+            user = await create_user(f'subscriber-{uuid.uuid4()}')
+            communicator = await connect(user)
+            for topic in ('limit.a', 'limit.b', 'limit.a', 'limit.c'):
+                await communicator.send_json_to({'event': 'subscribe', 'payload': {'topic': topic}})
+            messages = await receive_all(communicator)
+            await communicator.disconnect()
+            return messages
+
+        messages = run(main())
+        self.assertEqual([message['payload'] for message in messages if message['event'] == 'error'], [
+            {'topic': 'limit.c', 'max_subscriptions': 2, 'message': 'Too many topic subscriptions'}
+        ])
@@ -0,0 +1,17 @@
+import os
+import unittest
+
+from django.test import override_settings
+
+from channels_simplify.utils import output_path
+
+
+class OutputPathTest(unittest.TestCase):
+    @override_settings(CHANNELS_SIMPLIFY_OUTPUT_DIR='/var/diagnostics')
+    def test_file_name_placed_in_output_dir(self):
+        self.assertEqual(output_path('events.prof'), '/var/diagnostics/events.prof')
+        self.assertEqual(output_path('traffic-{pid}.cap'), f'/var/diagnostics/traffic-{os.getpid()}.cap')
+
+    def test_paths_rejected(self):
+        for name in ('', '.', '..', '../events.prof', '/etc/passwd', 'a/b.prof', '{0}.prof', '{pid.real}.cap'):
+            self.assertIsNone(output_path(name), name)